@@ -2,7 +2,7 @@ from typing import Tuple
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True, eq=True, order=True)
+@dataclass(frozen=True, eq=True, order=True, slots=True)
 class Action:
     """
     Class that represents actions in the game
@@ -0,0 +1,187 @@
+from functools import cache
+from typing import Tuple, List, Iterable, Dict
+
+import numpy as np
+
+from game.Board import Board
+from game.Geometry import DIRECTIONS, FORWARD_DIRECTIONS, Geometry, board_geometry
+
+
+def shift(mask: int, amount: int) -> int:
+    """
+    Shifts every bit of the mask by a signed amount of cell indices.
+    :param mask: bitmask of cells
+    :param amount: positive values move bits towards higher indices, negative ones towards lower indices
+    :return: the shifted bitmask (bits shifted below index 0 are dropped)
+    """
+    return mask << amount if amount >= 0 else mask >> -amount
+
+
+class BitboardTables:
+    """
+    Shift/mask tables of a board geometry - cells are indexed row by row: index = x * board_size + y
+    """
+    def __init__(self, geometry: Geometry):
+        self.triangle_size = geometry.triangle_size
+        self.board_size = board_size = geometry.board_size
+        self.full_mask = self.mask_of(geometry.cells)
+        self.coords: List[Tuple[int, int]] = [(i // board_size, i % board_size) for i in range(board_size ** 2)]
+
+        # (shift, mask of cells whose neighbour is on the board, mask of cells whose landing cell is on the board)
+        self.directions: List[Tuple[int, int, int]] = []
+        for dx, dy in DIRECTIONS:
+            crawl_mask = self.mask_of(
+                (x, y) for x, y in geometry.cells if (x + dx, y + dy) in geometry.neighbours[(x, y)])
+            jump_mask = self.mask_of(
+                (x, y) for x, y in geometry.cells if (x + 2 * dx, y + 2 * dy) in geometry.jumps[(x, y)])
+            self.directions.append((dx * board_size + dy, crawl_mask, jump_mask))
+
+        # Directions that make each player go towards its goal corner (see ChineseCheckers.forward_actions)
+        self.forward_directions = {player: [self.directions[DIRECTIONS.index(d)] for d in directions]
+                                   for player, directions in FORWARD_DIRECTIONS.items()}
+
+        # Move code (see Geometry.moves) of each (source index, destination index) step
+        self.codes: Dict[Tuple[int, int], int] = {
+            (self.index(action.src), self.index(action.dest)): code for code, action in enumerate(geometry.moves)}
+
+        self.top_mask = self.mask_of(map(tuple, geometry.goal_corners[1]))
+        self.bot_mask = self.mask_of(map(tuple, geometry.goal_corners[2]))
+
+    def index(self, coords: Tuple[int, int]) -> int:
+        return coords[0] * self.board_size + coords[1]
+
+    def mask_of(self, cells: Iterable[Tuple[int, int]]) -> int:
+        mask = 0
+        for cell in cells:
+            mask |= 1 << int(self.index(cell))
+        return mask
+
+    def cells_of(self, mask: int) -> Iterable[int]:
+        """
+        Iterates over the indices of the set bits of the mask, lowest index first.
+        """
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+
+@cache
+def bitboard_tables(geometry: Geometry) -> BitboardTables:
+    return BitboardTables(geometry)
+
+
+class BitBoard(Board):
+    """
+    Board backend that stores the pegs of each player as an integer bitmask.
+    The matrix view is only materialised on demand (heuristics, graphics, printing).
+    """
+    __slots__ = ('tables', 'pegs')
+
+    def __init__(self, triangle_size: int, initialised=True, matrix: np.ndarray = None, layout: str = 'diamond'):
+        self.triangle_size = triangle_size
+        self.geometry = board_geometry(triangle_size, layout)
+        self.board_size = self.geometry.board_size
+        self.tables = bitboard_tables(self.geometry)
+        self.pegs = [0, 0, 0]  # bitmask of the pegs of each player, indexed by the player index
+        self.zobrist = 0
+
+        if matrix is not None:
+            self.matrix = matrix
+        elif initialised:
+            self.init_board()
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """
+        Matrix view of the board - a fresh array, changes to it are not reflected on the board.
+        """
+        matrix = np.zeros(self.board_size * self.board_size, dtype=np.int8)
+        for player in (1, 2):
+            for cell in self.tables.cells_of(self.pegs[player]):
+                matrix[cell] = player
+        return matrix.reshape((self.board_size, self.board_size))
+
+    @matrix.setter
+    def matrix(self, matrix: np.ndarray):
+        assert matrix.shape == (self.board_size, self.board_size)
+        self.pegs = [0, 0, 0]
+        for player in (1, 2):
+            self.pegs[player] = self.tables.mask_of(map(tuple, np.argwhere(matrix == player)))
+        self.zobrist = self._compute_zobrist()
+
+    def _compute_zobrist(self) -> int:
+        keys = self.geometry.zobrist.pegs
+        coords = self.tables.coords
+        key = 0
+        for player in (1, 2):
+            for cell in self.tables.cells_of(self.pegs[player]):
+                key ^= keys[player][coords[cell]]
+        return key
+
+    @property
+    def occupied(self) -> int:
+        return self.pegs[1] | self.pegs[2]
+
+    def init_board(self):
+        self.pegs = [0, self.tables.bot_mask, self.tables.top_mask]
+        self.zobrist = self._compute_zobrist()
+
+    def is_cornered_pegs(self, corner: str) -> bool:
+        np_corner = self.tables.bot_mask if corner == 'bottom' else self.tables.top_mask
+        return self.occupied & np_corner == np_corner
+
+    def is_cornered_with(self, corner: str, value: int) -> bool:
+        np_corner = self.tables.bot_mask if corner == 'bottom' else self.tables.top_mask
+        return self.pegs[value] & np_corner == np_corner
+
+    def is_top_right_terminal(self) -> bool:
+        top = self.tables.top_mask
+        return self.occupied & top == top and self.pegs[2] & top != top
+
+    def is_bot_left_terminal(self) -> bool:
+        bot = self.tables.bot_mask
+        return self.occupied & bot == bot and self.pegs[1] & bot != bot
+
+    def move(self, initial_pos: Tuple[int, int], path: Tuple[int, int]):
+        if not self.within_bounds(path):
+            raise Exception(f'Coordinates out of bound: {path}')
+
+        src_bit = 1 << self.tables.index(initial_pos)
+        dest_bit = 1 << self.tables.index(path)
+        # Swap the content of both cells, like Board.move
+        keys = self.geometry.zobrist.pegs
+        for player in (1, 2):
+            mask = self.pegs[player]
+            if bool(mask & src_bit) != bool(mask & dest_bit):
+                self.pegs[player] = mask ^ src_bit ^ dest_bit
+                self.zobrist ^= keys[player][initial_pos] ^ keys[player][path]
+
+    def place_pegs(self, player_id: int, destinations: Iterable[Tuple[int, int]]):
+        mask = self.tables.mask_of(destinations)
+        for player in (1, 2):
+            self.pegs[player] &= ~mask
+        if player_id:
+            self.pegs[player_id] |= mask
+        self.zobrist = self._compute_zobrist()
+
+    def peg_at(self, cell: Tuple[int, int]) -> int:
+        bit = 1 << self.tables.index(cell)
+        return 1 if self.pegs[1] & bit else 2 if self.pegs[2] & bit else 0
+
+    def peg_cells(self, player: int) -> List[Tuple[int, int]]:
+        coords = self.tables.coords
+        return [coords[cell] for cell in self.tables.cells_of(self.pegs[player])]
+
+    def hash_key(self):
+        return self.pegs[1], self.pegs[2]
+
+    def __copy__(self):
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.triangle_size = self.triangle_size
+        new_board.board_size = self.board_size
+        new_board.geometry = self.geometry
+        new_board.tables = self.tables
+        new_board.pegs = self.pegs.copy()
+        new_board.zobrist = self.zobrist
+        return new_board
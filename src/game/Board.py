@@ -1,67 +1,74 @@
-from functools import cache, cached_property
+from bisect import insort
 from typing import Tuple, List, Iterable
 
 import numpy as np
 
-
-@cache
-def top_right_corner_coords(triangle_size: int, board_size: int) -> np.ndarray:
-    """
-    Returns the coordinates of the top-right corner of the board.
-    :return: list of coordinate pairs
-    """
-    res = []
-    for i in range(triangle_size):
-        for j in range(triangle_size):
-            if i + j < triangle_size:
-                res.append((i, board_size - 1 - j))
-    corner = (0, board_size - 1)
-    res.sort(key=lambda p: (p[0] - corner[0]) ** 2 + (p[1] - corner[1]) ** 2)
-    return np.array(res)
-
-
-@cache
-def bot_left_corner_coords(triangle_size: int, board_size: int) -> np.ndarray:
-    """
-    Returns the coordinates of the bottom-left corner of the board.
-    :return: list of coordinate pairs
-    """
-    res = []
-    for i in range(triangle_size):
-        for j in range(triangle_size):
-            if i + j < triangle_size:
-                res.append((board_size - 1 - i, j))
-    corner = (board_size - 1, 0)
-    res.sort(key=lambda p: (p[0] - corner[0]) ** 2 + (p[1] - corner[1]) ** 2)
-    return np.array(res)
+from game.Geometry import board_geometry
 
 
 class Board:
     """
     Class that represents the board of the game
     """
-    def __init__(self, triangle_size: int, initialised=True, matrix: np.ndarray = None):
+    __slots__ = ('triangle_size', 'board_size', 'geometry', '_matrix', 'zobrist', '_peg_cells', '_corner_counts')
+
+    def __init__(self, triangle_size: int, initialised=True, matrix: np.ndarray = None, layout: str = 'diamond'):
         self.triangle_size = triangle_size
-        self.board_size = triangle_size * 2 + 1
+        self.geometry = board_geometry(triangle_size, layout)
+        self.board_size = self.geometry.board_size
 
         if matrix is None:
-            self.matrix = np.zeros((self.board_size, self.board_size), dtype=int)
+            matrix = np.zeros((self.board_size, self.board_size), dtype=np.int8)
+            self.matrix = matrix
+            if initialised:
+                self.init_board()
         else:
             self.matrix = matrix
-            assert matrix.shape == (self.board_size, self.board_size)
 
-        if initialised and matrix is None:
-            self.init_board()
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix
+
+    @matrix.setter
+    def matrix(self, matrix: np.ndarray):
+        """
+        Replaces the whole matrix and recomputes the Zobrist key, the peg index and the corner counters of the board.
+        Writing directly into the matrix (board.matrix[x, y] = ...) bypasses them - use move/place_pegs instead.
+        The board keeps an int8 copy of the matrix, so later changes to the caller's array do not reach the board.
+        """
+        assert matrix.shape == (self.board_size, self.board_size)
+        self._matrix = np.array(matrix, dtype=np.int8)
+        self._sync()
+
+    def _sync(self):
+        """
+        Recomputes from scratch the data derived from the matrix - kept up to date by move afterwards.
+        """
+        keys = self.geometry.zobrist.pegs
+        self.zobrist = 0
+        self._peg_cells: List[List[Tuple[int, int]]] = [[], [], []]
+        for x, y in zip(*np.nonzero(self._matrix)):
+            cell = (int(x), int(y))
+            value = self._matrix[cell]
+            self.zobrist ^= keys[value][cell]
+            self._peg_cells[value].append(cell)
+
+        # _corner_counts[corner][value] - number of cells of the goal corner of a player holding the value
+        self._corner_counts: List[List[int]] = [[], [], []]
+        for corner in (1, 2):
+            values = self._matrix[self.geometry.goal_masks[corner]]
+            self._corner_counts[corner] = [int(np.sum(values == value)) for value in (0, 1, 2)]
 
     def init_board(self):
         """
         Initializes the board with the triangular matrices for each player at opposite corners.
         """
-        bottom_corner = bot_left_corner_coords(self.triangle_size, self.board_size)
-        top_corner = top_right_corner_coords(self.triangle_size, self.board_size)
+        bottom_corner = self.geometry.goal_corners[2]
+        top_corner = self.geometry.goal_corners[1]
 
-        self.matrix[bottom_corner[:, 0], bottom_corner[:, 1]] = 1
-        self.matrix[top_corner[:, 0], top_corner[:, 1]] = 2
+        self._matrix[bottom_corner[:, 0], bottom_corner[:, 1]] = 1
+        self._matrix[top_corner[:, 0], top_corner[:, 1]] = 2
+        self._sync()
 
     def adjacent_cells(self, src: Tuple[int, int]) -> List[Tuple[int, int]]:
         """
@@ -69,13 +76,7 @@ class Board:
         :param src: the coordinate pair of the source cell
         :return: list of diamond-adjacent cell coordinate pairs
         """
-        for i in range(-1, 2):
-            for j in range(-1, 2):
-                if i == -1 and j == 1 or i == 1 and j == -1:
-                    continue
-                dest = src[0] + i, src[1] + j
-                if self.within_bounds(dest):
-                    yield dest
+        return list(self.geometry.neighbours[src])
 
     def is_cornered_pegs(self, corner: str) -> bool:
         """
@@ -83,11 +84,7 @@ class Board:
         :param corner: string indicating the corner to be checked ('bottom' or 'top')
         :return: boolean value
         """
-        if corner == 'bottom':
-            np_corner = bot_left_corner_coords(self.triangle_size, self.board_size)
-        else:  # corner == 'top'
-            np_corner = top_right_corner_coords(self.triangle_size, self.board_size)
-        return np.all(self.matrix[np_corner[:, 0], np_corner[:, 1]] != 0)
+        return self._corner_counts[2 if corner == 'bottom' else 1][0] == 0
 
     def is_cornered_with(self, corner: str, value: int) -> bool:
         """
@@ -96,28 +93,23 @@ class Board:
         :param value: specific value to be checked for in the matrix
         :return: boolean value
         """
-        if corner == 'bottom':
-            np_corner = bot_left_corner_coords(self.triangle_size, self.board_size)
-        else:  # corner == 'top'
-            np_corner = top_right_corner_coords(self.triangle_size, self.board_size)
-
-        return np.all(self.matrix[np_corner[:, 0], np_corner[:, 1]] == value)
+        return self._corner_counts[2 if corner == 'bottom' else 1][value] == self.geometry.corner_size
 
     def is_top_right_terminal(self) -> bool:
         """
-        Checks if the top-right corner is terminal for player 1.
+        Checks if the top-right corner is terminal for player 1 - O(1) thanks to the corner counters.
         :return:
         """
-        return (self.is_cornered_pegs('top') and  # Initial config has TOP with 2's
-                not self.is_cornered_with('top', 2))
+        counts = self._corner_counts[1]
+        return counts[0] == 0 and counts[2] != self.geometry.corner_size  # Initial config has TOP with 2's
 
     def is_bot_left_terminal(self) -> bool:
         """
-        Checks if the bottom-left corner is terminal for player 2.
+        Checks if the bottom-left corner is terminal for player 2 - O(1) thanks to the corner counters.
         :return: boolean value
         """
-        return (self.is_cornered_pegs('bottom') and  # Initial config has BOTTOM with 1's
-                not self.is_cornered_with('bottom', 1))
+        counts = self._corner_counts[2]
+        return counts[0] == 0 and counts[1] != self.geometry.corner_size  # Initial config has BOTTOM with 1's
 
     def move(self, initial_pos: Tuple[int, int], path: Tuple[int, int]):
         """
@@ -131,9 +123,30 @@ class Board:
         if not self.within_bounds(path):
             raise Exception(f'Coordinates out of bound: {path}')
 
-        tmp = self.matrix[x][y]
-        self.matrix[x][y] = self.matrix[current_x][current_y]
-        self.matrix[current_x][current_y] = tmp
+        matrix = self._matrix
+        src_value = matrix[current_x][current_y]
+        dest_value = matrix[x][y]
+        if src_value != dest_value:
+            # Update the key of the board with the two swapped cells
+            keys = self.geometry.zobrist.pegs
+            self.zobrist ^= (keys[src_value][initial_pos] ^ keys[src_value][path] ^
+                             keys[dest_value][path] ^ keys[dest_value][initial_pos])
+            # Update the peg index - the lists stay sorted so that the pegs are always listed in the same order
+            for value, old, new in ((src_value, initial_pos, path), (dest_value, path, initial_pos)):
+                if value:
+                    cells = self._peg_cells[value]
+                    cells.remove(old)
+                    insort(cells, (new[0], new[1]))
+            # Update the corner counters
+            corner_of = self.geometry.corner_of
+            for cell, old, new in ((initial_pos, src_value, dest_value), (path, dest_value, src_value)):
+                corner = corner_of[cell]
+                if corner:
+                    counts = self._corner_counts[corner]
+                    counts[old] -= 1
+                    counts[new] += 1
+        matrix[x][y] = src_value
+        matrix[current_x][current_y] = dest_value
 
     def within_bounds(self, coords: Tuple[int, int]) -> bool:
         """
@@ -141,7 +154,7 @@ class Board:
         :param coords: the coordinate pair to be checked
         :return: boolean value indicating if the coordinates are within the bounds of the board
         """
-        return 0 <= coords[0] < self.board_size and 0 <= coords[1] < self.board_size
+        return self.geometry.within_bounds(coords)
 
     def place_pegs(self, player_id: int, destinations: Iterable[Tuple[int, int]]):
         """
@@ -150,16 +163,69 @@ class Board:
         :param destinations: iterable of destination coordinate pairs
         """
         for dest in destinations:
-            self.matrix[dest] = player_id
+            self._matrix[dest] = player_id
+        self._sync()
+
+    def peg_at(self, cell: Tuple[int, int]) -> int:
+        """
+        Returns the content of a cell.
+        :param cell: the coordinate pair of the cell
+        :return: player index of the peg on the cell, 0 when the cell is empty
+        """
+        return int(self._matrix[cell])
+
+    def peg_cells(self, player: int) -> List[Tuple[int, int]]:
+        """
+        Returns the coordinates of the pegs of a player, in row-major order - the list must not be modified.
+        :param player: player index
+        :return: list of coordinate pairs
+        """
+        return self._peg_cells[player]
+
+    def to_bytes(self) -> bytes:
+        """
+        Packed form of the board for storage - 2 bits per cell.
+        :return: bytes object
+        """
+        values = self.matrix.astype(np.uint8).ravel()
+        return np.packbits(np.stack((values >> 1, values & 1), axis=1)).tobytes()
+
+    @classmethod
+    def from_bytes(cls, triangle_size: int, data: bytes, layout: str = 'diamond') -> 'Board':
+        """
+        Rebuilds a board packed with to_bytes.
+        :param triangle_size: size of the triangles of the board
+        :param data: packed board
+        :param layout: layout of the board (see Geometry)
+        :return: the unpacked board
+        """
+        board_size = board_geometry(triangle_size, layout).board_size
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))[:2 * board_size ** 2].reshape(-1, 2)
+        values = (bits[:, 0] << 1 | bits[:, 1]).astype(np.int8)
+        return cls(triangle_size, matrix=values.reshape((board_size, board_size)), layout=layout)
+
+    def hash_key(self):
+        """
+        Returns a hashable value identifying the placement of the pegs on the board.
+        """
+        return bytes(self.matrix)
 
     def __str__(self):
         separator = '  '
         text = ' ' + separator + separator.join((str(i) for i in range(self.matrix.shape[0])))
-        for i, row in enumerate(self.matrix):
-            text += '\n' + str(i) + separator + separator.join(str(x) if x else '.' for x in row)
+        for i, (row, valid) in enumerate(zip(self.matrix, self.geometry.valid_mask)):
+            text += '\n' + str(i) + separator + separator.join(
+                str(x) if x else '.' if on_board else ' ' for x, on_board in zip(row, valid))
         return text
 
     def __copy__(self):
-        new_board = Board(self.triangle_size)
-        new_board.matrix = np.copy(self.matrix)
+        # Bypass __init__ - the key is copied instead of being recomputed
+        new_board = Board.__new__(Board)
+        new_board.triangle_size = self.triangle_size
+        new_board.board_size = self.board_size
+        new_board.geometry = self.geometry
+        new_board._matrix = np.copy(self._matrix)
+        new_board.zobrist = self.zobrist
+        new_board._peg_cells = [[], self._peg_cells[1].copy(), self._peg_cells[2].copy()]
+        new_board._corner_counts = [[], self._corner_counts[1].copy(), self._corner_counts[2].copy()]
         return new_board
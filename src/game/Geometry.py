@@ -0,0 +1,248 @@
+import random
+from functools import cache
+from typing import Tuple, List, Dict, Optional
+
+import numpy as np
+
+from game.Action import Action
+
+# Diamond-adjacent directions - (-1, 1) and (1, -1) are not adjacent on the diamond board
+DIRECTIONS = ((-1, -1), (-1, 0), (0, -1), (0, 1), (1, 0), (1, 1))
+# Directions that make each player go towards its goal corner (player 1 goes to the top-right corner)
+FORWARD_DIRECTIONS = {1: ((-1, 0), (0, 1)), 2: ((0, -1), (1, 0))}
+
+Cell = Tuple[int, int]
+
+# Step types (Step.CRAWL, Step.JUMP and Step.END - the Step module depends on the board, so it is not imported here)
+CRAWL, JUMP, END = 1, 2, 3
+
+# Every (dx, dy) a step can move a peg by - crawls, jumps and the END of a jump chain (0, 0) - in the order
+# of the head/tail steps of the geometry, so that vectorised move generation yields the same order
+STEP_OFFSETS = tuple(sorted({(0, 0)} | {(dx * distance, dy * distance)
+                                        for dx, dy in DIRECTIONS for distance in (1, 2)}))
+
+
+@cache
+def corner_coords(triangle_size: int, tip: Cell, inwards: Tuple[int, int]) -> np.ndarray:
+    """
+    Returns the coordinates of a corner triangle of the board, sorted by Euclidean distance to its tip.
+    :param triangle_size: size of the triangle
+    :param tip: cell at the tip of the corner
+    :param inwards: signs of the row and column steps going from the tip into the corner
+    :return: list of coordinate pairs
+    """
+    res = []
+    for i in range(triangle_size):
+        for j in range(triangle_size):
+            if i + j < triangle_size:
+                res.append((tip[0] + inwards[0] * i, tip[1] + inwards[1] * j))
+    res.sort(key=lambda p: (p[0] - tip[0]) ** 2 + (p[1] - tip[1]) ** 2)
+    return np.array(res)
+
+
+def top_right_corner_coords(triangle_size: int, board_size: int) -> np.ndarray:
+    """
+    Returns the coordinates of the top-right corner of the diamond board.
+    :return: list of coordinate pairs
+    """
+    return corner_coords(triangle_size, (0, board_size - 1), (1, -1))
+
+
+def bot_left_corner_coords(triangle_size: int, board_size: int) -> np.ndarray:
+    """
+    Returns the coordinates of the bottom-left corner of the diamond board.
+    :return: list of coordinate pairs
+    """
+    return corner_coords(triangle_size, (board_size - 1, 0), (-1, 1))
+
+
+class ZobristKeys:
+    """
+    Random 64-bit keys used to hash states incrementally - the key of a state is the XOR of the keys of
+    its pegs, of the player to move, of the mode, of the moved peg and of the cells visited by a jump chain
+    """
+    def __init__(self, cells: List[Cell], board_size: int, seed: int = 0):
+        rng = random.Random(seed)  # fixed seed - keys are stable between runs
+        # pegs[player][cell] - the player 0 (empty cell) has null keys so that swaps can be hashed blindly
+        self.pegs: List[Dict[Cell, int]] = [dict.fromkeys(cells, 0)]
+        for _ in (1, 2):
+            self.pegs.append({cell: rng.getrandbits(64) for cell in cells})
+        self.player: Dict[int, int] = {player: rng.getrandbits(64) for player in (1, 2)}
+        self.mode: Dict[int, int] = {mode: rng.getrandbits(64) for mode in (1, 2, 3)}  # Step.CRAWL/JUMP/END
+        self.peg: Dict[Tuple[Optional[int], Optional[int]], int] = {cell: rng.getrandbits(64) for cell in cells}
+        self.peg[(None, None)] = 0
+        self.visited: Dict[Cell, int] = {cell: rng.getrandbits(64) for cell in cells}
+
+        # The same keys as uint64 arrays indexed by flat cell index (x * board_size + y), for vectorised hashing
+        def table(keys: Dict[Cell, int]) -> np.ndarray:
+            array = np.zeros(board_size * board_size, dtype=np.uint64)
+            for (x, y), key in keys.items():
+                if x is not None:
+                    array[x * board_size + y] = key
+            return array
+        self.pegs_table = np.stack([table(keys) for keys in self.pegs])
+        self.player_table = np.array([0, self.player[1], self.player[2]], dtype=np.uint64)
+        self.mode_table = np.array([0] + [self.mode[mode] for mode in (1, 2, 3)], dtype=np.uint64)
+        self.peg_table = table(self.peg)
+        self.visited_table = table(self.visited)
+
+
+class Geometry:
+    """
+    Per-cell lookup tables of the board layout - built once per layout and triangle size and shared by every board
+    (use board_geometry to get the shared instance).
+    This class is the diamond layout: a square matrix of side 2 * triangle_size + 1 whose two acute corners are
+    the goal triangles. Other layouts override board_size_of, on_board and goal_tips - every table is derived from them.
+    """
+    layout = 'diamond'
+
+    def __init__(self, triangle_size: int):
+        self.triangle_size = triangle_size
+        self.board_size = board_size = self.board_size_of(triangle_size)
+        # Cells of the board in row-major order - the matrix cells outside the layout are never used
+        self.cells: List[Cell] = [(i, j) for i in range(board_size) for j in range(board_size) if self.on_board(i, j)]
+        self.valid_mask = np.zeros((board_size, board_size), dtype=bool)
+        self.valid_mask[tuple(np.array(self.cells).T)] = True
+
+        # In-bounds crawl targets of each cell, in DIRECTIONS order
+        self.neighbours: Dict[Cell, Tuple[Cell, ...]] = {}
+        # In-bounds jumps of each cell: landing cell -> jumped-over cell
+        self.jumps: Dict[Cell, Dict[Cell, Cell]] = {}
+        for cell in self.cells:
+            self.neighbours[cell] = tuple(dest for dest in (self._offset(cell, d, 1) for d in DIRECTIONS)
+                                          if self.within_bounds(dest))
+            self.jumps[cell] = {self._offset(cell, d, 2): self._offset(cell, d, 1) for d in DIRECTIONS
+                                if self.within_bounds(self._offset(cell, d, 2))}
+
+        # Dense move index - every (src, dest, step_type) a step can ever be, in Action order: code -> action and back
+        self.moves: List[Action] = sorted(
+            [Action(cell, dest, CRAWL) for cell in self.cells for dest in self.neighbours[cell]]
+            + [Action(cell, dest, JUMP) for cell in self.cells for dest in self.jumps[cell]]
+            + [Action(cell, cell, END) for cell in self.cells])
+        self.move_codes: Dict[Action, int] = {action: code for code, action in enumerate(self.moves)}
+
+        # (destination, jumped-over cell or None, move code) of each cell, ordered by offset like the former 5x5 scan:
+        # head steps are the crawls and jumps that start a turn, tail steps are the END and jumps that follow a jump
+        self.head_steps: Dict[Cell, Tuple[Tuple[Cell, Optional[Cell], int], ...]] = {}
+        self.tail_steps: Dict[Cell, Tuple[Tuple[Cell, Optional[Cell], int], ...]] = {}
+        for cell in self.cells:
+            head = [(dest, None, self.move_codes[Action(cell, dest, CRAWL)]) for dest in self.neighbours[cell]]
+            head += [(dest, over, self.move_codes[Action(cell, dest, JUMP)])
+                     for dest, over in self.jumps[cell].items()]
+            head.sort(key=lambda step: step[0])
+            self.head_steps[cell] = tuple(head)
+            tail = [(cell, None, self.move_codes[Action(cell, cell, END)])]
+            tail += [(dest, over, self.move_codes[Action(cell, dest, JUMP)])
+                     for dest, over in self.jumps[cell].items()]
+            tail.sort(key=lambda step: step[0])
+            self.tail_steps[cell] = tuple(tail)
+
+        # Subsets of the head/tail steps that go along the forward directions of each player - the END of a jump chain
+        # is kept - and flag of each move code telling if it is a forward move of the player
+        self.forward_head_steps: Dict[int, Dict[Cell, Tuple[Tuple[Cell, Optional[Cell], int], ...]]] = {}
+        self.forward_tail_steps: Dict[int, Dict[Cell, Tuple[Tuple[Cell, Optional[Cell], int], ...]]] = {}
+        self.is_forward: Dict[int, List[bool]] = {}
+        for player, directions in FORWARD_DIRECTIONS.items():
+            def forward(cell: Cell, dest: Cell) -> bool:
+                dx, dy = dest[0] - cell[0], dest[1] - cell[1]
+                return (dx, dy) == (0, 0) or (int(np.sign(dx)), int(np.sign(dy))) in directions
+            self.forward_head_steps[player] = {
+                cell: tuple(step for step in self.head_steps[cell] if forward(cell, step[0])) for cell in self.cells}
+            self.forward_tail_steps[player] = {
+                cell: tuple(step for step in self.tail_steps[cell] if forward(cell, step[0])) for cell in self.cells}
+            self.is_forward[player] = [forward(action.src, action.dest) for action in self.moves]
+
+        # Goal corner of each player - player 1 goes to the top-right corner, player 2 to the bottom-left one
+        self.goal_tips: Dict[int, Cell] = self.goal_tips_of(triangle_size, board_size)
+        self.goal_corners: Dict[int, np.ndarray] = {
+            1: corner_coords(triangle_size, self.goal_tips[1], (1, -1)),
+            2: corner_coords(triangle_size, self.goal_tips[2], (-1, 1)),
+        }
+        # Same cells as tuples, in the same order - the first empty one is the target of the heuristics
+        self.goal_cells: Dict[int, Tuple[Cell, ...]] = {
+            player: tuple((int(x), int(y)) for x, y in corner) for player, corner in self.goal_corners.items()}
+        self.goal_masks: Dict[int, np.ndarray] = {}
+        for player, corner in self.goal_corners.items():
+            mask = np.zeros((board_size, board_size), dtype=bool)
+            mask[corner[:, 0], corner[:, 1]] = True
+            self.goal_masks[player] = mask
+        # Goal corner each cell belongs to (0 for cells outside the corners) and number of cells of a corner
+        self.corner_of: Dict[Cell, int] = dict.fromkeys(self.cells, 0)
+        for player, corner in self.goal_corners.items():
+            for x, y in corner:
+                self.corner_of[(int(x), int(y))] = player
+        self.corner_size = len(self.goal_corners[1])
+
+        # Distances between every pair of cells, indexed by [target x, target y, cell x, cell y] - the heuristics
+        # gather the distances of the pegs to a goal target from table[target]
+        x, y = np.indices((board_size, board_size))
+        dx = np.abs(x[:, :, None, None] - x[None, None, :, :])
+        dy = np.abs(y[:, :, None, None] - y[None, None, :, :])
+        same_sign = ((x[:, :, None, None] - x) * (y[:, :, None, None] - y)) >= 0
+        self.manhattan_distances: np.ndarray = dx + dy
+        self.euclidean_distances: np.ndarray = np.hypot(dx, dy)
+        # Number of crawls between the cells: the diagonal directions (-1, -1) and (1, 1) move along both axes
+        self.hex_distances: np.ndarray = np.where(same_sign, np.maximum(dx, dy), dx + dy)
+
+        # Average Euclidean distance between the two initial corner triangles
+        bottom_corner = self.goal_corners[2]
+        self.initial_avg_euclidean = float(
+            self.euclidean_distances[self.goal_tips[1]][bottom_corner[:, 0], bottom_corner[:, 1]].mean())
+
+        # Upper bound of the number of actions of a state - every peg doing every step of the busiest cell
+        self.max_legal_moves = self.corner_size * max(len(steps) for steps in self.head_steps.values())
+
+        self.zobrist = ZobristKeys(self.cells, board_size)
+
+    @staticmethod
+    def board_size_of(triangle_size: int) -> int:
+        return triangle_size * 2 + 1
+
+    def on_board(self, x: int, y: int) -> bool:
+        return True
+
+    @staticmethod
+    def goal_tips_of(triangle_size: int, board_size: int) -> Dict[int, Cell]:
+        """
+        Tip cell of the goal corner of each player - player 1 goes to the top-right corner, player 2 to the bottom-left
+        """
+        return {1: (0, board_size - 1), 2: (board_size - 1, 0)}
+
+    @staticmethod
+    def _offset(cell: Cell, direction: Tuple[int, int], distance: int) -> Cell:
+        return cell[0] + direction[0] * distance, cell[1] + direction[1] * distance
+
+    def within_bounds(self, coords: Tuple[int, int]) -> bool:
+        x, y = coords
+        return 0 <= x < self.board_size and 0 <= y < self.board_size and bool(self.valid_mask[x, y])
+
+
+class StarGeometry(Geometry):
+    """
+    The standard star board - a hexagon with a triangle on each side (121 holes for a triangle size of 4), embedded
+    in a square matrix of side 4 * triangle_size + 1 with the same adjacency as the diamond board.
+    The two players use opposite points of the star; the four other points are empty cells of the board.
+    """
+    layout = 'star'
+
+    @staticmethod
+    def board_size_of(triangle_size: int) -> int:
+        return triangle_size * 4 + 1
+
+    def on_board(self, x: int, y: int) -> bool:
+        # Cube coordinates centered on the middle cell - the star is the union of two big triangles
+        center = 2 * self.triangle_size
+        q, r, s = x - center, center - y, y - x
+        return min(q, r, s) >= -self.triangle_size or max(q, r, s) <= self.triangle_size
+
+    @staticmethod
+    def goal_tips_of(triangle_size: int, board_size: int) -> Dict[int, Cell]:
+        return {1: (triangle_size, 3 * triangle_size), 2: (3 * triangle_size, triangle_size)}
+
+
+GEOMETRIES = {geometry.layout: geometry for geometry in (Geometry, StarGeometry)}
+
+
+@cache
+def board_geometry(triangle_size: int, layout: str = 'diamond') -> Geometry:
+    return GEOMETRIES[layout](triangle_size)
@@ -1,13 +1,13 @@
-import numpy as np
-
+from copy import copy
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
 from game.Step import Step
 from game.Board import Board
+from game.Geometry import board_geometry
 
 
-@dataclass
+@dataclass(slots=True)
 class State:
     """
     Class that represents the state of the game
@@ -16,16 +16,64 @@ class State:
     player: int = 1  # the player index to move
     mode: int = Step.END  # the mode of the last action applied
     peg: Tuple[Optional[int], Optional[int]] = (None, None)  # the peg that was moved in the last action
+    visited: Tuple[Tuple[int, int], ...] = ()  # cells left by the peg during the current chain of jumps
 
     def copy(self):
-        return State(self.board, self.player, self.mode, self.peg)
+        """
+        Returns an independent copy of the state - its board can be modified in place (see ChineseCheckers.apply)
+        """
+        return State(copy(self.board), self.player, self.mode, self.peg, self.visited)
+
+    def to_bytes(self) -> bytes:
+        """
+        Packed form of the state for storage - player, mode, moved peg and visited cells followed by the packed board
+        :return: bytes object
+        """
+        board_size = self.board.board_size
+        peg = 0xFFFF if self.peg[0] is None else self.peg[0] * board_size + self.peg[1]
+        visited = b''.join((x * board_size + y).to_bytes(2, 'little') for x, y in self.visited)
+        return (bytes((self.player, self.mode)) + peg.to_bytes(2, 'little') + bytes((len(self.visited),)) +
+                visited + self.board.to_bytes())
+
+    @staticmethod
+    def from_bytes(triangle_size: int, data: bytes, board_cls=Board, layout: str = 'diamond') -> 'State':
+        """
+        Rebuilds a state packed with to_bytes
+        :param triangle_size: size of the triangles of the board
+        :param data: packed state
+        :param board_cls: board backend of the state
+        :param layout: layout of the board (see Geometry)
+        :return: the unpacked state
+        """
+        board_size = board_geometry(triangle_size, layout).board_size
+        peg = int.from_bytes(data[2:4], 'little')
+        peg = (None, None) if peg == 0xFFFF else divmod(peg, board_size)
+        visited_end = 5 + 2 * data[4]
+        visited = tuple(divmod(int.from_bytes(data[i:i + 2], 'little'), board_size) for i in range(5, visited_end, 2))
+        board = board_cls.from_bytes(triangle_size, data[visited_end:], layout)
+        return State(board, data[0], data[1], peg, visited)
 
     def __str__(self):
-        return f"board:\n{self.board}\nplayer: {self.player} mode: {self.mode} peg: {self.peg}"
+        return f"board:\n{self.board}\nplayer: {self.player} mode: {self.mode} peg: {self.peg} visited: {self.visited}"
+
+    @property
+    def key(self) -> int:
+        """
+        64-bit Zobrist key of the state - combines the incrementally maintained key of the board
+        with the keys of the player to move, the mode, the moved peg and the cells visited by the jump chain
+        """
+        keys = self.board.geometry.zobrist
+        key = self.board.zobrist ^ keys.player[self.player] ^ keys.mode[self.mode] ^ keys.peg[self.peg]
+        for cell in self.visited:
+            key ^= keys.visited[cell]
+        return key
 
     def __eq__(self, other):
-        return (self.player == other.player and self.mode == other.mode
-                and self.peg == other.peg and np.array_equal(self.board.matrix, other.board.matrix))
+        # Different keys tell the states apart at once - equal keys are confirmed against the pegs of each player (in
+        # row-major order on every board backend) to rule out a collision
+        return (self.key == other.key and self.player == other.player and self.mode == other.mode
+                and self.peg == other.peg and set(self.visited) == set(other.visited)
+                and all(self.board.peg_cells(player) == other.board.peg_cells(player) for player in (1, 2)))
 
     def __hash__(self):
-        return hash((bytes(self.board.matrix), self.player, self.mode, self.peg))
+        return self.key
@@ -31,14 +31,7 @@ class Step:
         :param dest: destination peg coordinate tuple
         :return: flag indicating if the movement is valid
         """
-        x1, y1 = src
-        x2, y2 = dest
-        delta_x12 = abs(x1 - x2)
-        delta_y12 = abs(y1 - y2)
-        if (((delta_x12 == 1 and delta_y12 == 0) or
-             (delta_x12 == 0 and delta_y12 == 1) or
-             abs(x1 + y1 - (x2 + y2)) == 2 and delta_x12 == 1)
-                and board.matrix[x2][y2] == 0):
+        if dest in board.geometry.neighbours[src] and board.matrix[dest] == 0:
             return True
         return False
 
@@ -51,17 +44,10 @@ class Step:
         :param dest: destination peg coordinate tuple
         :return: flag indicating if the movement is valid
         """
-        x1, y1 = src
-        x2, y2 = dest
-        delta_x12 = abs(x1 - x2)
-        delta_y12 = abs(y1 - y2)
-        if (((abs(x1 + y1 - (x2 + y2)) == 4 and delta_x12 == 2) or
-             (delta_x12 == 2 and delta_y12 == 0) or
-             (delta_x12 == 0 and delta_y12 == 2)) and
-                board.matrix[(x1 + x2) // 2][(y1 + y2) // 2] != 0 and
-                board.matrix[x2][y2] == 0):
+        over = board.geometry.jumps[src].get(dest)
+        if over is not None and board.matrix[over] != 0 and board.matrix[dest] == 0:
             return True
-        pass
+        return False
 
     @staticmethod
     def validate_head(board: Board, src: Tuple[int, int], dest: Tuple[int, int]) -> Optional[int]:
@@ -72,8 +58,7 @@ class Step:
         :param dest: destination peg coordinate tuple
         :return: flag indicating the type of movement allowed
         """
-        if (abs(src[0] - dest[0]) <= 1 and abs(src[1] - dest[1]) <= 1
-                and Step._validate_crawl(board, src, dest)):
+        if Step._validate_crawl(board, src, dest):
             return Step.CRAWL
         elif Step._validate_jump(board, src, dest):
             return Step.JUMP
@@ -0,0 +1,135 @@
+from functools import cache
+from typing import Callable, Iterable, List, Tuple
+
+import numpy as np
+
+from game.Action import Action
+from game.Geometry import Cell, Geometry
+from game.State import State
+
+
+class Symmetry:
+    """
+    Reflection of the board that preserves the hex adjacency - every symmetry of the board is its own inverse,
+    so the same object maps states and actions to the transformed board and back
+    """
+    def __init__(self, geometry: Geometry, name: str, transform: Callable[[Cell], Cell], swaps_colours: bool):
+        """
+        :param geometry: geometry of the board
+        :param name: name of the symmetry
+        :param transform: image of a cell
+        :param swaps_colours: flag indicating if the symmetry exchanges the goal corners (and so the players)
+        """
+        self.name = name
+        self.swaps_colours = swaps_colours
+        self.cells = {cell: transform(cell) for cell in geometry.cells}
+        self.cells[(None, None)] = (None, None)
+
+        # Matrix indices such that transformed_matrix = matrix[rows, cols]
+        board_size = geometry.board_size
+        self.rows = np.zeros((board_size, board_size), dtype=np.intp)
+        self.cols = np.zeros((board_size, board_size), dtype=np.intp)
+        for cell in geometry.cells:
+            self.rows[self.cells[cell]], self.cols[self.cells[cell]] = cell
+
+        # peg_keys[player][cell] - Zobrist key of the image of a peg of the player on the cell
+        keys = geometry.zobrist
+        self.peg_keys = [dict.fromkeys(geometry.cells, 0)]
+        for player in (1, 2):
+            self.peg_keys.append({cell: keys.pegs[self.player(player)][self.cells[cell]] for cell in geometry.cells})
+
+    def player(self, player: int) -> int:
+        return 3 - player if self.swaps_colours else player
+
+    def action(self, action: Action) -> Action:
+        return Action(self.cells[action.src], self.cells[action.dest], action.step_type)
+
+    def key(self, state: State) -> int:
+        """
+        Zobrist key of the transformed state, computed without building it
+        :param state: state to be transformed
+        :return: the key State.key of the transformed state would have
+        """
+        keys = state.board.geometry.zobrist
+        key = keys.player[self.player(state.player)] ^ keys.mode[state.mode] ^ keys.peg[self.cells[state.peg]]
+        for cell in state.visited:
+            key ^= keys.visited[self.cells[cell]]
+        for player in (1, 2):
+            peg_keys = self.peg_keys[player]
+            for cell in state.board.peg_cells(player):
+                key ^= peg_keys[cell]
+        return key
+
+    def state(self, state: State) -> State:
+        """
+        Transformed copy of a state
+        :param state: state to be transformed
+        :return: the new state
+        """
+        matrix = state.board.matrix[self.rows, self.cols]
+        if self.swaps_colours:
+            matrix = np.where(matrix == 0, 0, 3 - matrix)
+        board = type(state.board)(state.board.triangle_size, initialised=False,
+                                  layout=state.board.geometry.layout)
+        board.matrix = matrix
+        return State(board, self.player(state.player), state.mode, self.cells[state.peg],
+                     tuple(self.cells[cell] for cell in state.visited))
+
+
+@cache
+def board_symmetries(geometry: Geometry) -> Tuple[Symmetry, ...]:
+    """
+    Symmetries of the board, identity first: the reflection across the anti-diagonal keeps both goal corners,
+    the transposition and the half turn exchange them (and so swap the colours of the pegs)
+    """
+    last = geometry.board_size - 1
+    return (
+        Symmetry(geometry, 'identity', lambda cell: cell, swaps_colours=False),
+        Symmetry(geometry, 'anti-diagonal', lambda cell: (last - cell[1], last - cell[0]), swaps_colours=False),
+        Symmetry(geometry, 'transposition', lambda cell: (cell[1], cell[0]), swaps_colours=True),
+        Symmetry(geometry, 'half turn', lambda cell: (last - cell[0], last - cell[1]), swaps_colours=True),
+    )
+
+
+def canonical(state: State, colour_swaps: bool = False) -> Tuple[int, Symmetry]:
+    """
+    Canonical key of a state - the smallest key among its symmetric images - and the symmetry that reaches it
+    :param state: the state
+    :param colour_swaps: flag indicating if the symmetries exchanging the players are used
+        (only valid for values that do not depend on the colour of the players)
+    :return: the canonical key and the symmetry mapping the state to its canonical representative
+    """
+    symmetries = board_symmetries(state.board.geometry)
+    best_key, best = state.key, symmetries[0]
+    for symmetry in symmetries[1:]:
+        if colour_swaps or not symmetry.swaps_colours:
+            key = symmetry.key(state)
+            if key < best_key:
+                best_key, best = key, symmetry
+    return best_key, best
+
+
+def canonical_key(state: State, colour_swaps: bool = False) -> int:
+    return canonical(state, colour_swaps)[0]
+
+
+def canonical_state(state: State, colour_swaps: bool = False) -> Tuple[State, Symmetry]:
+    """
+    Canonical representative of a state
+    :return: the representative and the symmetry mapping the state to it (and the actions of the representative
+        back to the actions of the state)
+    """
+    symmetry = canonical(state, colour_swaps)[1]
+    return symmetry.state(state), symmetry
+
+
+def canonical_order(state: State, actions: Iterable[Action], colour_swaps: bool = False) -> List[Action]:
+    """
+    Orders the actions of a state by their image on the canonical representative - symmetric states get their
+    corresponding actions at the same positions, so per-move statistics indexed by position can be shared
+    :param state: the state
+    :param actions: actions of the state
+    :return: sorted list of actions
+    """
+    symmetry = canonical(state, colour_swaps)[1]
+    return sorted(actions, key=symmetry.action)
@@ -0,0 +1,281 @@
+import random
+import sys
+import time
+from dataclasses import dataclass
+from functools import cache
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+if __name__ == "__main__":
+    sys.path.append("src")
+
+from game.Geometry import STEP_OFFSETS, board_geometry
+from game.State import State
+from game.Step import Step
+from game_problem.ChineseCheckers import ChineseCheckers
+from game_problem.MacroChineseCheckers import MacroChineseCheckers
+
+# Values of the cells of the playout boards besides the pegs of the players (1 and 2) - one bit each, so that OR-ing
+# the cells of a goal corner tells if it is full and who holds it. The cells visited by the current chain of jumps
+# are neither empty nor jumpable, like the cells outside of the board.
+EMPTY, WALL, VISITED = 4, 8, 16
+# Modes of the pegs of the player to move: any step but END, the jumping peg (jumps and END), the other pegs in the
+# JUMP mode (no step)
+NORMAL, JUMPING, WAITING = 0, 1, 2
+# Winner of the playouts ended in a draw
+DRAW = -1
+# Legality of a step by the values of its target and of its jumped cell read as one little-endian 16-bit number
+# (see StepTables): an empty target and a peg in the jumped cell
+LEGAL = np.zeros(1 << 16, dtype=np.int8)
+LEGAL[[EMPTY + (1 << 8), EMPTY + (2 << 8)]] = 1
+# Winner by the OR of the cells of the goal corner of player 1 and of player 2 - a corner is terminal when it is full
+# (no bit above 2) and holds a peg of its player
+WINNERS = np.array([[1 if top in (1, 3) else 2 if bot in (2, 3) else 0 for bot in range(32)] for top in range(32)])
+
+
+@dataclass(frozen=True, slots=True)
+class StepTables:
+    """
+    Step of every offset of STEP_OFFSETS from every cell, on boards flattened with cell index = x * B + y and two
+    extra cells: a wall (index B * B) and a cell that is always empty (index B * B + 1).
+    A step is legal when its target is empty, its jumped cell holds a peg and the mode of the peg allows it - the
+    target of END is the empty cell and its jumped cell the cell of the peg, so that the same test holds.
+    """
+    checks: np.ndarray  # (B * B + 2, 26) target and jumped cell of each of the 13 offsets, interleaved
+    destinations: np.ndarray  # (B * B + 2, 13) destination of the peg
+    step_types: np.ndarray  # (13,) step type of each offset
+    sources: np.ndarray  # (13,) value left in the cell of the peg by each offset (VISITED for the jumps)
+    peg_modes: np.ndarray  # (3, 13) offsets allowed in each peg mode
+    forward: np.ndarray  # (3, 13) offsets that make each player move forward (see ChineseCheckers.forward_actions)
+    weights: np.ndarray  # (3, 3, 13) peg_modes of each player, raised to 2 for its forward offsets
+
+
+@cache
+def step_tables(triangle_size: int, layout: str = 'diamond') -> StepTables:
+    """
+    Builds the step tables of a board
+    :param triangle_size: size of the triangles of the board
+    :param layout: layout of the board (see Geometry)
+    :return: the step tables
+    """
+    geometry = board_geometry(triangle_size, layout)
+    board_size = geometry.board_size
+    wall, free = board_size ** 2, board_size ** 2 + 1
+    targets = np.full((board_size ** 2 + 2, len(STEP_OFFSETS)), wall, dtype=np.intp)
+    jumped = targets.copy()
+    step_types = np.array([Step.END if (dx, dy) == (0, 0) else Step.CRAWL if max(abs(dx), abs(dy)) == 1 else Step.JUMP
+                           for dx, dy in STEP_OFFSETS], dtype=np.int8)
+
+    def index(x: int, y: int) -> int:
+        on_board = 0 <= x < board_size and 0 <= y < board_size and geometry.on_board(x, y)
+        return x * board_size + y if on_board else wall
+
+    for x, y in geometry.cells:
+        cell = x * board_size + y
+        for rank, (dx, dy) in enumerate(STEP_OFFSETS):
+            if step_types[rank] == Step.END:
+                targets[cell, rank], jumped[cell, rank] = free, cell
+            elif step_types[rank] == Step.CRAWL:
+                targets[cell, rank], jumped[cell, rank] = index(x + dx, y + dy), cell
+            else:
+                targets[cell, rank], jumped[cell, rank] = index(x + dx, y + dy), index(x + dx // 2, y + dy // 2)
+    destinations = np.where(step_types == Step.END, np.arange(board_size ** 2 + 2)[:, None], targets)
+
+    peg_modes = np.stack([step_types != Step.END, step_types != Step.CRAWL, np.zeros(len(STEP_OFFSETS), dtype=bool)])
+    dx, dy = np.array(STEP_OFFSETS).T
+    forward = np.zeros((3, len(STEP_OFFSETS)), dtype=bool)
+    for player, sign in ((1, 1), (2, -1)):
+        # Player 2 moves forward along the reversed directions of player 1
+        forward[player] = ((sign * dx < 0) & (sign * dy >= 0)) | ((sign * dx <= 0) & (sign * dy > 0)) \
+            | (step_types == Step.END)
+    sources = np.where(step_types == Step.JUMP, VISITED, EMPTY)
+    weights = peg_modes[None] * (1 + forward[:, None])
+    checks = np.stack([targets, jumped], axis=2).reshape(len(targets), -1)
+    return StepTables(checks, destinations, step_types, sources, peg_modes, forward, weights)
+
+
+class BatchPlayouts:
+    """
+    Random playouts advanced in lockstep - every step plays one random action in each unfinished playout at once,
+    with NumPy arrays instead of State and Action objects.
+    Each playout keeps the cells of its pegs, and the steps of the pegs of the player to move are read from the step
+    tables of the board (see StepTables) - a step of the playouts is a fixed number of NumPy calls on small arrays.
+    The policy is the one of MCTSPlayer.forward_playout (uniform among the forward actions, falling back to all the
+    actions when there is none) or, with forward=False, the one of MCTSPlayer.playout.
+    """
+    def __init__(self, problem: ChineseCheckers, forward: bool = True, max_steps: Optional[int] = None,
+                 seed: Optional[int] = None):
+        """
+        :param problem: the game problem the playouts are played on - the playouts play steps, so the turns of
+                        MacroChineseCheckers are not supported
+        :param forward: flag indicating if the forward-biased policy is used
+        :param max_steps: optional number of steps after which the unfinished playouts are scored as draws
+        :param seed: seed of the random generator
+        """
+        if isinstance(problem, MacroChineseCheckers):
+            raise ValueError('BatchPlayouts plays steps - MacroChineseCheckers is not supported')
+        self.problem = problem
+        self.forward = forward
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def stack_playouts(states: Sequence[State]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Stack states into the arrays the playouts are played on
+        :param states: states of the same board
+        :return: flattened boards (N, B * B + 2) with the wall, empty and visited cells of StepTables, cells of the
+                 pegs of each player (N, 3, P), players (N,) and modes of the pegs of the player to move (N, P)
+        """
+        geometry = states[0].board.geometry
+        matrices, players, modes, pegs, visited = ChineseCheckers.stack_states(states)
+        n, board_size = len(states), geometry.board_size
+        boards = np.full((n, board_size ** 2 + 2), EMPTY, dtype=np.int8)
+        boards[:, -2] = WALL
+        boards[:, :-2] = np.where(geometry.valid_mask, np.where(matrices == 0, EMPTY, matrices), WALL).reshape(n, -1)
+        boards[:, :-2][visited.reshape(n, -1)] = VISITED
+
+        # Cells of the pegs in row-major order, completed with the wall (which has no legal step) for the players with
+        # less pegs than the others
+        size = max(int(np.max(np.sum(boards == player, axis=1))) for player in (1, 2))
+        cells = np.full((n, 3, size), board_size ** 2, dtype=np.intp)
+        for player in (1, 2):
+            owned = boards[:, :-2] == player
+            order = np.argsort(~owned, axis=1, kind='stable')[:, :size]
+            cells[:, player] = np.where(np.take_along_axis(owned, order, axis=1), order, board_size ** 2)
+
+        players = players.astype(np.intp)
+        peg_modes = np.full((n, size), NORMAL, dtype=np.intp)
+        for i in np.flatnonzero(modes == Step.JUMP):
+            peg_modes[i] = np.where(cells[i, players[i]] == pegs[i, 0] * board_size + pegs[i, 1], JUMPING, WAITING)
+        return boards, cells, players, peg_modes
+
+    @staticmethod
+    def step_weights(boards: np.ndarray, cells: np.ndarray, players: np.ndarray, peg_modes: np.ndarray,
+                     tables: StepTables, forward: bool = True, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Weights of the steps of each playout - 0 for the illegal steps, 1 for the legal ones and, with forward, 2 for
+        the legal forward ones
+        :param boards, cells, players, peg_modes: arrays of stack_playouts
+        :param tables: step tables of the board
+        :param forward: flag indicating if the forward steps are told apart
+        :param rows: optional np.arange(N)
+        :return: (N, P, 13) weights of the steps of each peg of the player to move, by offset
+        """
+        rows = np.arange(len(boards)) if rows is None else rows
+        # Values of the target and of the jumped cell of every step, gathered at once
+        values = boards[rows[:, None, None], tables.checks[cells[rows, players]]]
+        legal = LEGAL[values.view('<u2')]
+        if forward:
+            return legal * tables.weights[players[:, None], peg_modes]
+        return legal * tables.peg_modes[peg_modes]
+
+    def run(self, states: Sequence[State]) -> np.ndarray:
+        """
+        Play one random playout from each state until the end of the game
+        :param states: the states the playouts start from
+        :return: (N,) outcomes for the player to move in each starting state - 1 for a win, 0 for a loss
+                 and 0.5 for a draw (playout cut by max_steps, or player left without any action)
+        """
+        geometry = states[0].board.geometry
+        tables = step_tables(geometry.triangle_size, geometry.layout)
+        destinations, step_types, sources = tables.destinations, tables.step_types, tables.sources
+        goal_cells = np.stack([np.flatnonzero(geometry.goal_masks[player]) for player in (1, 2)])
+
+        def winners_of(boards: np.ndarray) -> np.ndarray:
+            # Same test as ChineseCheckers.winners_batch (the visited cells are empty)
+            corners = np.bitwise_or.reduce(boards[:, goal_cells], axis=2)
+            return WINNERS[corners[:, 0], corners[:, 1]]
+
+        boards, cells, players, peg_modes = self.stack_playouts(states)
+        starters = players.copy()
+        waiting = np.full(cells.shape[2], WAITING)
+        outcomes = np.full(len(states), 0.5)
+        # Index of each unfinished playout in states - the arrays only keep the unfinished playouts
+        playing = np.arange(len(states))
+        rows = np.arange(len(states))
+        winners = winners_of(boards)
+        steps = 0
+        while True:
+            if winners.any():
+                finished = winners != 0
+                results = winners[finished]
+                outcomes[playing[finished]] = np.where(results == DRAW, 0.5, results == starters[finished])
+                keep = ~finished
+                playing, boards, cells = playing[keep], boards[keep], cells[keep]
+                players, peg_modes, starters = players[keep], peg_modes[keep], starters[keep]
+                rows = np.arange(len(playing))
+            if not len(playing) or (self.max_steps is not None and steps >= self.max_steps):
+                break
+            steps += 1
+
+            # Random keys of the steps are raised by their weights - the highest key is a uniform choice among the
+            # forward steps, or among all the steps when there is none
+            weights = self.step_weights(boards, cells, players, peg_modes, tables, self.forward, rows)
+            keys = self.rng.random(weights.shape)
+            keys += weights
+            keys = keys.reshape(len(rows), -1)
+            chosen = keys.argmax(axis=1)
+            # A player without any action ends its playout in a draw
+            stuck = keys[rows, chosen] < 1
+            peg, rank = np.divmod(chosen, len(STEP_OFFSETS))
+            src = cells[rows, players, peg]
+            dest = destinations[src, rank]
+            types = step_types[rank]
+            jumps = types == Step.JUMP
+
+            # Move the pegs (src == dest for END) and update the state fields like ChineseCheckers.apply
+            boards[rows, src] = sources[rank]
+            boards[rows, dest] = players
+            cells[rows, players, peg] = dest
+            ends = np.flatnonzero(types == Step.END)
+            if len(ends):
+                ended = boards[ends]
+                ended[ended == VISITED] = EMPTY
+                boards[ends] = ended
+            peg_modes = jumps[:, None] * waiting
+            peg_modes[rows, peg] = jumps
+            players = np.where(jumps, players, 3 - players)
+
+            winners = winners_of(boards)
+            # The step chosen for a stuck playout is not legal - its board is dropped
+            winners[stuck] = DRAW
+
+        return outcomes
+
+    def playouts(self, state: State, k: int) -> np.ndarray:
+        """
+        Play k independent playouts from the same state
+        :param state: the state the playouts start from
+        :param k: number of playouts
+        :return: (k,) outcomes for the player to move in the state
+        """
+        return self.run([state] * k)
+
+
+if __name__ == "__main__":
+    # python src/game_problem/BatchPlayouts.py [triangle size] [layout]
+    # Playouts per second of MCTSPlayer.forward_playout and of batches of k playouts from the same states
+    from players.MCTSPlayer import MCTSPlayer
+
+    problem = ChineseCheckers(int(sys.argv[1]) if len(sys.argv) > 1 else 3, layout=sys.argv[2] if len(sys.argv) > 2
+                              else 'diamond')
+    rng = random.Random(0)
+    states = [problem.initial_state()]
+    for _ in range(20):
+        states.append(problem.result(states[-1], rng.choice(list(problem.actions(states[-1])))))
+    states = states[::5]
+
+    def rate(play, k: int) -> float:
+        count, start = 0, time.perf_counter()
+        while time.perf_counter() - start < 2:
+            for state in states:
+                play(state)
+                count += k
+        return count / (time.perf_counter() - start)
+
+    print(f'sequential: {rate(lambda state: MCTSPlayer.forward_playout(problem, state), 1):.0f} playouts/s')
+    batch_playouts = BatchPlayouts(problem, seed=0)
+    for k in (4, 8, 16, 32, 128):
+        print(f'k={k}: {rate(lambda state: batch_playouts.playouts(state, k), k):.0f} playouts/s')
@@ -0,0 +1,62 @@
+from typing import Iterable, List, Tuple
+
+from game.BitBoard import BitBoard, shift
+from game.State import State
+from game.Step import Step
+from game_problem.ChineseCheckers import ChineseCheckers
+
+
+class BitboardChineseCheckers(ChineseCheckers):
+    """
+    Chinese Checkers on the bitboard backend - crawls and jumps of all the pegs are generated at once,
+    one direction at a time, with shifts and masks instead of per-cell validation.
+    The actions are the same as ChineseCheckers.actions, only their order differs.
+    """
+    def initial_state(self) -> State:
+        return State(BitBoard(self.triangle_size, layout=self.layout), 1, mode=Step.END, peg=(None, None))
+
+    @staticmethod
+    def _directional_codes(state: State, movers: int, directions: List[Tuple[int, int, int]],
+                           crawls: bool, excluded: int = 0) -> Iterable[int]:
+        """
+        Generate the crawls and jumps of a set of pegs in the given directions, as move codes
+        :param state: current state of the game
+        :param movers: bitmask of the pegs to be moved
+        :param directions: (shift, crawl mask, jump mask) entries of the bitboard tables
+        :param crawls: flag indicating if crawls are allowed
+        :param excluded: bitmask of the cells that cannot be landed on
+        :return: an iterable of the codes of the valid actions (see Geometry.moves)
+        """
+        board = state.board
+        tables = board.tables
+        codes = tables.codes
+        occupied = board.occupied
+        empty = tables.full_mask & ~occupied & ~excluded
+
+        for offset, crawl_mask, jump_mask in directions:
+            if crawls:
+                for dest in tables.cells_of(shift(movers & crawl_mask, offset) & empty):
+                    yield codes[dest - offset, dest]
+            jumpers = movers & jump_mask & shift(occupied, -offset)
+            for dest in tables.cells_of(shift(jumpers, 2 * offset) & empty):
+                yield codes[dest - 2 * offset, dest]
+
+    def _bitboard_codes(self, state: State, directions: List[Tuple[int, int, int]]) -> Iterable[int]:
+        board = state.board
+        if state.mode == Step.JUMP:
+            # Only the jumping peg can keep on jumping or end its move
+            peg_index = board.tables.index(state.peg)
+            peg_bit = 1 << peg_index
+            if board.pegs[state.player] & peg_bit:
+                yield board.tables.codes[peg_index, peg_index]
+                # The chain of jumps never lands back on a cell it already visited
+                visited = board.tables.mask_of(state.visited)
+                yield from self._directional_codes(state, peg_bit, directions, crawls=False, excluded=visited)
+        else:
+            yield from self._directional_codes(state, board.pegs[state.player], directions, crawls=True)
+
+    def _codes(self, state: State) -> Iterable[int]:
+        return self._bitboard_codes(state, state.board.tables.directions)
+
+    def _forward_codes(self, state: State) -> Iterable[int]:
+        return self._bitboard_codes(state, state.board.tables.forward_directions[state.player])
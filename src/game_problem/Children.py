@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from typing import List, Tuple, Type
+
+import numpy as np
+
+from game.Action import Action
+from game.Board import Board
+from game.State import State
+
+
+@dataclass(slots=True)
+class Children:
+    """
+    Children of a state stored as arrays - built at once by ChineseCheckers.results, the i-th entry of each field
+    describes the state obtained by applying actions[i]. State objects are only built on demand with state(i).
+    """
+    actions: List[Action]  # the applied actions
+    boards: np.ndarray  # (k, B, B) board matrices
+    players: np.ndarray  # (k,) player to move
+    modes: np.ndarray  # (k,) mode of the last action applied
+    pegs: np.ndarray  # (k, 2) peg moved by the last action
+    visited: List[Tuple[Tuple[int, int], ...]]  # cells visited by the current chain of jumps
+    keys: np.ndarray  # (k,) uint64 Zobrist keys, equal to State.key of the children
+    winners: np.ndarray  # (k,) winning player, 0 when the game is not over
+    triangle_size: int  # size of the triangles of the board
+    board_cls: Type[Board] = Board  # board backend of the states built by state
+    layout: str = 'diamond'  # layout of the board (see Geometry)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    @property
+    def terminal(self) -> np.ndarray:
+        """
+        (k,) flags indicating the terminal children
+        """
+        return self.winners != 0
+
+    def state(self, i: int) -> State:
+        """
+        Builds the i-th child as a State object
+        :param i: index of the child
+        :return: a new state
+        """
+        board = self.board_cls(self.triangle_size, initialised=False, layout=self.layout)
+        board.matrix = self.boards[i].copy()
+        return State(board, int(self.players[i]), int(self.modes[i]), tuple(int(c) for c in self.pegs[i]),
+                     self.visited[i])
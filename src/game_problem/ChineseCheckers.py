@@ -1,23 +1,42 @@
 from copy import copy
-from typing import Tuple, Iterable
+from typing import Tuple, Iterable, List, Sequence, Dict, Optional
+
+import numpy as np
 
 from game.Action import Action
 from game.Board import Board
+from game.Geometry import STEP_OFFSETS, Geometry, board_geometry
 from game.State import State
 from game.Step import Step
+from game_problem.Children import Children
 from game_problem.GameProblem import GameProblem
+from game_problem.LRUCache import LRUCache
+
+# (applied action, player, mode, peg and visited cells of the state before the action)
+UndoToken = Tuple[Action, int, int, Tuple[int, int], Tuple[Tuple[int, int], ...]]
+# Steps of each cell - see Geometry.head_steps
+StepTable = Dict[Tuple[int, int], Tuple[Tuple[Tuple[int, int], Optional[Tuple[int, int]], int], ...]]
 
 
 class ChineseCheckers(GameProblem):
-    def __init__(self, triangle_size: int = 3):
+    def __init__(self, triangle_size: int = 3, move_cache_size: int = 10000, layout: str = 'diamond'):
+        """
+        :param triangle_size: size of the corner triangles of the board
+        :param move_cache_size: number of move lists kept by the move cache (0 disables it)
+        :param layout: layout of the board - 'diamond' (two-player board) or 'star' (standard six-pointed board,
+            see Geometry)
+        """
         self.triangle_size = triangle_size
+        self.layout = layout
+        # Move lists of the recently expanded states, keyed by (state hash, forward flag) - shared by every player
+        self.move_cache = LRUCache(move_cache_size)
 
     def initial_state(self) -> State:
         """
         Initial state of the Chinese Checkers game
         :return: a state object
         """
-        return State(Board(self.triangle_size), 1, mode=Step.END, peg=(None, None))
+        return State(Board(self.triangle_size, layout=self.layout), 1, mode=Step.END, peg=(None, None))
 
     def player(self, state: State) -> int:
         """
@@ -28,64 +47,223 @@ class ChineseCheckers(GameProblem):
         return state.player
 
     @staticmethod
-    def _peg_actions(state, src: Tuple[int, int]) -> Iterable[Action]:
+    def _peg_codes(state, src: Tuple[int, int], head_steps: StepTable = None,
+                   tail_steps: StepTable = None) -> Iterable[int]:
         """
-        Generate all possible actions for a selected peg
+        Generate all possible actions for a selected peg, as move codes
         :param state: current state of the game
         :param src: the selected peg coordinate pair
-        :return: an iterable of valid actions
+        :param head_steps: steps that start a turn to consider (Geometry.head_steps by default)
+        :param tail_steps: steps that follow a jump to consider (Geometry.tail_steps by default)
+        :return: an iterable of the codes of the valid actions (see Geometry.moves)
         """
         board = state.board
+        matrix = board.matrix
 
-        for i in range(-2, 3):
-            for j in range(-2, 3):
-                if board.within_bounds((src[0] + i, src[1] + j)):
-                    res = None
+        if state.mode == Step.JUMP:
+            if src != state.peg:
+                return
+            # The chain of jumps never lands back on a cell it already visited
+            visited = state.visited
+            for dest, over, code in (tail_steps or board.geometry.tail_steps)[src]:
+                if over is None or (matrix[over] != 0 and matrix[dest] == 0 and dest not in visited):
+                    yield code
+        else:
+            for dest, over, code in (head_steps or board.geometry.head_steps)[src]:
+                if matrix[dest] == 0 and (over is None or matrix[over] != 0):
+                    yield code
 
-                    if state.mode == Step.JUMP and src == state.peg:
-                        res = Step.validate_tail(board, src, (src[0] + i, src[1] + j))
+    def _codes(self, state: State, head_steps: StepTable = None, tail_steps: StepTable = None) -> Iterable[int]:
+        if state.mode == Step.JUMP:
+            # Only the jumping peg can move
+            yield from self._peg_codes(state, state.peg, head_steps, tail_steps)
+            return
+        for peg in state.board.peg_cells(state.player):
+            yield from self._peg_codes(state, peg, head_steps, tail_steps)
 
-                    if state.mode == Step.END or state.mode == Step.CRAWL:
-                        res = Step.validate_head(board, src, (src[0] + i, src[1] + j))
+    def _forward_codes(self, state: State) -> Iterable[int]:
+        # Only the steps along the forward directions of the player are looked at
+        geometry = state.board.geometry
+        return self._codes(state, geometry.forward_head_steps[state.player], geometry.forward_tail_steps[state.player])
 
-                    if res is not None:
-                        yield Action(src, (src[0] + i, src[1] + j), res)
+    def _move_list(self, state: State, forward: bool, cached: bool) -> Iterable[int]:
+        """
+        Codes of the actions (or of the forward actions) of a state, read from the move cache when possible
+        """
+        if not cached or self.move_cache.max_size <= 0:
+            return self._forward_codes(state) if forward else self._codes(state)
+        key = (hash(state), forward)
+        codes = self.move_cache.get(key)
+        if codes is None:
+            codes = tuple(self._forward_codes(state) if forward else self._codes(state))
+            self.move_cache.put(key, codes)
+        return codes
 
-    def actions(self, state: State) -> Iterable[Action]:
+    def actions(self, state: State, encoded: bool = False, cached: bool = True) -> Iterable:
         """
         Generate all possible actions for the current state
         :param state: current state of the game
+        :param encoded: flag to get the move codes of the actions (see Geometry.moves) instead of Action objects
+        :param cached: flag indicating if the move cache is used - states that are seldom seen again, like the
+            states of random playouts, would only evict useful entries
         :return: an iterable of valid actions
         """
-        board = state.board
-        for i in range(board.board_size):
-            for j in range(board.board_size):
-                if board.matrix[i][j] == state.player:
-                    yield from self._peg_actions(state, (i, j))
-    
-    def forward_actions(self, state: State) -> Iterable[Action]:
+        codes = self._move_list(state, forward=False, cached=cached)
+        if encoded:
+            return codes
+        moves = state.board.geometry.moves
+        return (moves[code] for code in codes)
+
+    def encode(self, action: Action) -> int:
+        """
+        Dense move code of an action - its index in Geometry.moves
+        """
+        return board_geometry(self.triangle_size, self.layout).move_codes[action]
+
+    def decode(self, code: int) -> Action:
+        """
+        Action of a dense move code
+        """
+        return board_geometry(self.triangle_size, self.layout).moves[code]
+
+    def move_table(self, geometry: Geometry) -> List[Action]:
+        """
+        Actions of every dense move code of a board (see encode) - the code of an action is its index
+        :param geometry: geometry of the board
+        :return: list of actions
+        """
+        return geometry.moves
+
+    def max_actions(self, geometry: Geometry) -> int:
+        """
+        Upper bound of the number of actions of a state of a board
+        :param geometry: geometry of the board
+        :return: maximal number of actions
+        """
+        return geometry.max_legal_moves
+
+    @staticmethod
+    def stack_states(states: Sequence[State]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Stack states into the arrays taken by actions_batch
+        :param states: states of the same board size
+        :return: boards (N, B, B), players (N,), modes (N,), pegs (N, 2) (-1 when unset) and visited (N, B, B)
+        """
+        boards = np.stack([state.board.matrix for state in states])
+        players = np.array([state.player for state in states], dtype=np.int8)
+        modes = np.array([state.mode for state in states], dtype=np.int8)
+        pegs = np.array([(-1, -1) if state.peg[0] is None else state.peg for state in states], dtype=np.intp)
+        visited = np.zeros(boards.shape, dtype=bool)
+        for i, state in enumerate(states):
+            for x, y in state.visited:
+                visited[i, x, y] = True
+        return boards, players, modes, pegs, visited
+
+    @staticmethod
+    def actions_batch(boards: np.ndarray, players: np.ndarray, modes: np.ndarray, pegs: np.ndarray,
+                      visited: np.ndarray = None, valid: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generate all possible actions of a stack of states at once (vectorised version of actions)
+        :param boards: (N, B, B) stack of board matrices
+        :param players: (N,) player to move in each state
+        :param modes: (N,) mode of each state
+        :param pegs: (N, 2) jumping peg of each state (only read in the JUMP mode)
+        :param visited: optional (N, B, B) mask of the cells visited by the jump chain of each state
+        :param valid: optional (B, B) mask of the cells on the board (Geometry.valid_mask), required when the
+                      board matrix holds cells outside of the board (star layout)
+        :return: (M, 3) array of encoded actions (source cell index, destination cell index, step type) with
+                 cell index = x * B + y, and (N + 1,) offsets - the actions of the state i are
+                 moves[offsets[i]:offsets[i + 1]], in the same order as actions
+        """
+        boards = np.asarray(boards)
+        n, board_size = boards.shape[0], boards.shape[1]
+        jumping = np.asarray(modes) == Step.JUMP
+        movers = boards == np.asarray(players).reshape(n, 1, 1)
+        # In the JUMP mode only the jumping peg can move
+        peg_mask = np.zeros(boards.shape, dtype=bool)
+        jumping_states = np.flatnonzero(jumping)
+        peg_mask[jumping_states, pegs[jumping_states, 0], pegs[jumping_states, 1]] = True
+        movers &= np.where(jumping[:, None, None], peg_mask, True)
+
+        # Cells outside of the board are padded as walls (-1): they are neither empty nor jumpable
+        if valid is not None:
+            boards = np.where(valid, boards, -1)
+        padded = np.pad(boards, ((0, 0), (2, 2), (2, 2)), constant_values=-1)
+        empty = padded == 0
+        if visited is not None:
+            # The chain of jumps never lands back on a cell it already visited
+            empty[:, 2:-2, 2:-2] &= ~np.asarray(visited, dtype=bool)
+
+        def around(array: np.ndarray, dx: int, dy: int) -> np.ndarray:
+            # Value of the padded array at (x + dx, y + dy) for every cell (x, y) of the board
+            return array[:, 2 + dx:2 + dx + board_size, 2 + dy:2 + dy + board_size]
+
+        states, sources, destinations, step_types, ranks = [], [], [], [], []
+        for rank, (dx, dy) in enumerate(STEP_OFFSETS):
+            if (dx, dy) == (0, 0):
+                step_type, allowed = Step.END, movers & jumping[:, None, None]
+            elif max(abs(dx), abs(dy)) == 1:
+                step_type, allowed = Step.CRAWL, movers & ~jumping[:, None, None] & around(empty, dx, dy)
+            else:
+                step_type = Step.JUMP
+                allowed = movers & around(empty, dx, dy) & (around(padded, dx // 2, dy // 2) > 0)
+            state, x, y = np.nonzero(allowed)
+            states.append(state)
+            sources.append(x * board_size + y)
+            destinations.append((x + dx) * board_size + (y + dy))
+            step_types.append(np.full(len(state), step_type))
+            ranks.append(np.full(len(state), rank))
+
+        states, sources, ranks = np.concatenate(states), np.concatenate(sources), np.concatenate(ranks)
+        # Pegs in row-major order, then steps in offset order - the order of actions
+        order = np.lexsort((ranks, sources, states))
+        moves = np.stack([sources, np.concatenate(destinations), np.concatenate(step_types)], axis=1)[order]
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(states, minlength=n))))
+        return moves, offsets
+
+    @staticmethod
+    def decode_actions(moves: np.ndarray, board_size: int) -> List[Action]:
+        """
+        Convert encoded actions of actions_batch back to Action objects
+        :param moves: (M, 3) array of encoded actions
+        :param board_size: size of the board the actions were generated on
+        :return: list of actions
+        """
+        return [Action(divmod(int(src), board_size), divmod(int(dest), board_size), int(step_type))
+                for src, dest, step_type in moves]
+
+    def forward_actions(self, state: State, encoded: bool = False, cached: bool = True) -> Iterable:
         """
         Generate possible actions that makes the player move forward for the current state
         :param state: current state of the game
+        :param encoded: flag to get the move codes of the actions (see Geometry.moves) instead of Action objects
+        :param cached: flag indicating if the move cache is used (see actions)
         :return: an iterable of valid actions
         """
-        # print()
-        board = state.board
-        for i in range(board.board_size):
-            for j in range(board.board_size):
-                if board.matrix[i][j] == state.player:
-                    for action in self._peg_actions(state, (i,j)):
-                        # print(action)
-                        if state.player==1:
-                            if ((action.dest[0]<action.src[0] and action.dest[1]>=action.src[1]) \
-                                or (action.dest[0]<=action.src[0]and action.dest[1]>action.src[1]) \
-                                or (action.step_type==Step.END)):
-                                yield action
-                        else:
-                            if (action.dest[0]>action.src[0] and action.dest[1]<=action.src[1]) \
-                                or (action.dest[0]>=action.src[0] and action.dest[1]<action.src[1]) \
-                                or (action.step_type==Step.END):
-                                yield action
+        codes = self._move_list(state, forward=True, cached=cached)
+        if encoded:
+            return codes
+        moves = state.board.geometry.moves
+        return (moves[code] for code in codes)
+
+    def forward_and_all_actions(self, state: State, encoded: bool = False,
+                                cached: bool = True) -> Tuple[List, List]:
+        """
+        Generate the actions of the current state and split out the forward ones in the same pass - for the players
+        that fall back to all the actions when there is no forward action
+        :param state: current state of the game
+        :param encoded: flag to get the move codes of the actions (see Geometry.moves) instead of Action objects
+        :param cached: flag indicating if the move cache is used (see actions)
+        :return: the list of forward actions and the list of all the actions
+        """
+        geometry = state.board.geometry
+        is_forward = geometry.is_forward[state.player]
+        codes = list(self._move_list(state, forward=False, cached=cached))
+        forward = [code for code in codes if is_forward[code]]
+        if encoded:
+            return forward, codes
+        moves = geometry.moves
+        return [moves[code] for code in forward], [moves[code] for code in codes]
 
     def result(self, state: State, action: Action) -> State:
         """
@@ -94,15 +272,99 @@ class ChineseCheckers(GameProblem):
         :param action: action to be applied
         :return: the new state obtained
         """
-        new_board = copy(state.board)
-        new_board.move(action.src, action.dest)
+        new_state = state.copy()
+        self.apply(new_state, action)
+        return new_state
+
+    def results(self, state: State, actions: Sequence[Action]) -> Children:
+        """
+        Apply each action to the current state at once - vectorised version of result that builds no State object
+        :param state: current state of the game
+        :param actions: actions to be applied
+        :return: the children of the state, as arrays
+        """
+        actions = list(actions)
+        geometry = state.board.geometry
+        board_size = geometry.board_size
+        rows = np.arange(len(actions))
+        cells = np.array([(action.src, action.dest) for action in actions], dtype=np.intp).reshape(len(actions), 2, 2)
+        src = cells[:, 0, 0] * board_size + cells[:, 0, 1]
+        dest = cells[:, 1, 0] * board_size + cells[:, 1, 1]
+        modes = self._child_modes(actions)
+        jumps = modes == Step.JUMP
+        players = np.where(jumps, state.player, 3 - state.player).astype(np.int8)
 
-        new_state = State(new_board, state.player, action.step_type, action.dest)
+        # Move the pegs (src == dest for END), like apply
+        boards = np.repeat(state.board.matrix.reshape(1, -1), len(actions), axis=0)
+        values = boards[rows, src]
+        boards[rows, src] = 0
+        boards[rows, dest] = values
 
-        if action.step_type == Step.CRAWL or action.step_type == Step.END:
-            new_state.player = 3 - state.player
+        # Keys of the children from the key of the state - the changes of State.key made by apply
+        keys = geometry.zobrist
+        cleared_visited = 0
+        for cell in state.visited:
+            cleared_visited ^= keys.visited[cell]
+        parent_key = np.uint64(state.key ^ keys.player[state.player] ^ keys.mode[state.mode] ^ keys.peg[state.peg])
+        children_keys = (parent_key ^ keys.pegs_table[state.player, src] ^ keys.pegs_table[state.player, dest]
+                         ^ keys.player_table[players] ^ keys.mode_table[modes] ^ keys.peg_table[dest]
+                         ^ np.where(jumps, keys.visited_table[src], np.uint64(cleared_visited)))
 
-        return new_state
+        visited = [state.visited + (action.src,) if jump else () for action, jump in zip(actions, jumps)]
+        return Children(actions, boards.reshape(len(actions), board_size, board_size), players, modes, cells[:, 1],
+                        visited, children_keys, self.winners_batch(boards, geometry), state.board.triangle_size,
+                        type(state.board), geometry.layout)
+
+    @staticmethod
+    def _child_modes(actions: Sequence[Action]) -> np.ndarray:
+        """
+        Mode of the state reached by each action (see apply) - the step type of the action
+        :param actions: actions applied by results
+        :return: (N,) modes
+        """
+        return np.array([action.step_type for action in actions], dtype=np.int8)
+
+    @staticmethod
+    def winners_batch(boards: np.ndarray, geometry: Geometry) -> np.ndarray:
+        """
+        Winner of each board of a stack - vectorised version of utility
+        :param boards: (N, B, B) board matrices, or (N, B * B) flattened ones
+        :param geometry: geometry of the boards
+        :return: (N,) winning players, 0 when the game is not over
+        """
+        boards = boards.reshape(len(boards), geometry.board_size ** 2)
+        top, bot = geometry.goal_masks[1].ravel(), geometry.goal_masks[2].ravel()
+        top_terminal = (boards[:, top] != 0).all(axis=1) & ~(boards[:, top] == 2).all(axis=1)
+        bot_terminal = (boards[:, bot] != 0).all(axis=1) & ~(boards[:, bot] == 1).all(axis=1)
+        return np.where(top_terminal, 1, np.where(bot_terminal, 2, 0))
+
+    def apply(self, state: State, action: Action) -> UndoToken:
+        """
+        Apply the action to the current state in place - cheaper than result as no board is copied
+        :param state: current state of the game, modified in place
+        :param action: action to be applied
+        :return: the undo token needed to revert the action with undo
+        """
+        undo_token = (action, state.player, state.mode, state.peg, state.visited)
+        state.board.move(action.src, action.dest)
+        state.mode = action.step_type
+        state.peg = action.dest
+        if action.step_type == Step.JUMP:
+            state.visited = state.visited + (action.src,)
+        else:
+            state.visited = ()
+            state.player = 3 - state.player
+        return undo_token
+
+    def undo(self, state: State, undo_token: UndoToken):
+        """
+        Revert in place an action applied with apply - actions must be undone in reverse order
+        :param state: the state the action was applied to
+        :param undo_token: the token returned by apply
+        """
+        action, state.player, state.mode, state.peg, state.visited = undo_token
+        # Moving a peg swaps the content of the two cells - swapping them back restores the board
+        state.board.move(action.dest, action.src)
 
     def terminal_test(self, state: State) -> bool:
         """
@@ -30,3 +30,16 @@ class GameProblem(ABC):
     @abstractmethod
     def utility(self, state, player):
         raise NotImplementedError
+
+    def apply(self, state, action):
+        """
+        Apply the action to the state in place
+        :return: an undo token to be given back to undo
+        """
+        raise NotImplementedError
+
+    def undo(self, state, undo_token):
+        """
+        Revert in place the action that produced the undo token
+        """
+        raise NotImplementedError
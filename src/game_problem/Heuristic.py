@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import Any, List, Optional, Tuple
 
 import numpy as np
 
-from game import Board
-from game.Board import bot_left_corner_coords, top_right_corner_coords
+from game.Action import Action
+from game.Board import Board
+from game.Geometry import Cell, Geometry, board_geometry
 from game.State import State
+from game_problem.LRUCache import LRUCache
+from game_problem.PatternDatabase import PatternDatabase
 
 """
 Utility functions for evaluation of board states.
@@ -13,11 +16,28 @@ Primarily different Heuristics functions
 """
 
 
+def peg_indices(board: Board, player: int) -> np.ndarray:
+    """
+    Returns the coordinates of the pegs of a player, read from the peg index of the board
+    :return: array of coordinate pairs
+    """
+    return np.array(board.peg_cells(player), dtype=int).reshape(-1, 2)
+
+
+def peg_distances(table: np.ndarray, board: Board, player: int, target) -> np.ndarray:
+    """
+    Returns the distances between the pegs of a player and a target cell, gathered from a distance table
+    :param table: distance table of the geometry (manhattan_distances, euclidean_distances or hex_distances)
+    :param target: coordinate pair of the target cell
+    :return: array of distances, one per peg
+    """
+    indices = peg_indices(board, player)
+    return table[target[0], target[1]][indices[:, 0], indices[:, 1]]
+
+
 def average_euclidean_to_corner(board: Board, player: int) -> float:
     corner = decide_goal_corner_coordinates(board, player)
-    indices = np.argwhere(board.matrix == player)
-    distances = np.linalg.norm(indices - corner, axis=1)
-    return np.mean(distances)
+    return np.mean(peg_distances(board.geometry.euclidean_distances, board, player, corner))
 
 
 def initial_avg_euclidean(board: Board):
@@ -25,41 +45,75 @@ def initial_avg_euclidean(board: Board):
     Returns the average Euclidian distance between the two initial corner triangles
     :return: mean of Euclidian distances
     """
-    bottom_corner = bot_left_corner_coords(board.triangle_size, board.board_size)
-    diffs = bottom_corner - [0, board.board_size - 1]
-    distances = np.linalg.norm(diffs, axis=1)
-    return np.mean(distances)
+    return board.geometry.initial_avg_euclidean
 
 
 def average_manhattan_to_corner(board: Board, player: int) -> float:
     corner = decide_goal_corner_coordinates(board, player)
-    indices = np.argwhere(board.matrix == player)
-    distances = np.sum(np.abs(indices - corner), axis=1)
-    return np.mean(distances)
+    return np.mean(peg_distances(board.geometry.manhattan_distances, board, player, corner))
+
+
+def average_hex_to_corner(board: Board, player: int) -> float:
+    """
+    Returns the average number of crawls the pegs of the player need to reach the goal corner
+    """
+    corner = decide_goal_corner_coordinates(board, player)
+    return np.mean(peg_distances(board.geometry.hex_distances, board, player, corner))
 
 
 def max_manhattan_to_corner(board: Board, player: int) -> float:
     corner = decide_goal_corner_coordinates(board, player)
-    indices = np.argwhere(board.matrix == player)
-    distances = np.sum(np.abs(indices - corner), axis=1)
-    return np.max(distances)
+    return np.max(peg_distances(board.geometry.manhattan_distances, board, player, corner))
+
+
+def average_distance_to_each_corner(table: np.ndarray, board: Board, player: int) -> float:
+    """
+    Returns the mean over the empty cells of the goal corner of the player of the average distance between its pegs
+    and the cell - every peg has the same weight for every cell, so it is the mean of all the (cell, peg) distances,
+    gathered at once
+    :param table: distance table of the geometry (see peg_distances)
+    :return: mean distance, 0 when the goal corner is full
+    """
+    free = empty_goal_cells(board, player)
+    if not free:
+        return 0
+    free = np.array(free)
+    indices = peg_indices(board, player)
+    return table[free[:, 0, None], free[:, 1, None], indices[:, 0], indices[:, 1]].mean()
 
 
 def decide_goal_corner_coordinates(board: Board, player: int):
-    if player == 1:
-        corner = top_right_corner_coords(board.triangle_size, board.board_size)
-    else:
-        corner = bot_left_corner_coords(board.triangle_size, board.board_size)
-    for pair in corner:
+    for pair in board.geometry.goal_corners[player]:
         if board.matrix[pair[0], pair[1]] == 0:
             return pair
 
     # Base case
-    if player == 1:
-        corner = [0, board.board_size - 1]
-    else:
-        corner = [board.board_size - 1, 0]
-    return corner
+    return list(board.geometry.goal_tips[player])
+
+
+def goal_target(board: Board, player: int) -> Cell:
+    """
+    Same cell as decide_goal_corner_coordinates, as a coordinate pair read cell by cell
+    :return: the first empty cell of the goal corner of the player, the tip of the corner when it is full
+    """
+    for cell in board.geometry.goal_cells[player]:
+        if board.peg_at(cell) == 0:
+            return cell
+    return board.geometry.goal_tips[player]
+
+
+def empty_goal_cells(board: Board, player: int) -> Tuple[Cell, ...]:
+    """
+    Returns the empty cells of the goal corner of the player, in the order of the goal corner.
+    """
+    return tuple(cell for cell in board.geometry.goal_cells[player] if board.peg_at(cell) == 0)
+
+
+def moved_peg(state: State, action: Action, player: int) -> bool:
+    """
+    Checks if the action (already applied to the state) moved a peg of the player.
+    """
+    return action.src != action.dest and state.board.peg_at(action.dest) == player
 
 
 def sum_player_pegs(board: Board, player: int) -> float:
@@ -69,26 +123,180 @@ def sum_player_pegs(board: Board, player: int) -> float:
     :param player: int
     :return:
     """
-    if player == 1:
-        corner = top_right_corner_coords(board.triangle_size, board.board_size)
-    else:
-        corner = bot_left_corner_coords(board.triangle_size, board.board_size)
-    return np.sum(board.matrix[corner[:, 0], corner[:, 1]] == player)
+    return np.sum(board.matrix[board.geometry.goal_masks[player]] == player)
+
+
+def batch_geometry(boards: np.ndarray, geometry: Optional[Geometry]) -> Geometry:
+    """
+    Returns the geometry of a stack of boards - the diamond layout of their size unless given
+    """
+    return geometry if geometry is not None else board_geometry((boards.shape[1] - 1) // 2)
+
+
+def goal_targets_batch(boards: np.ndarray, player: int, geometry: Geometry) -> np.ndarray:
+    """
+    Vectorised decide_goal_corner_coordinates
+    :param boards: (N, B, B) stack of board matrices
+    :return: (N, 2) first empty cell of the goal corner of the player on each board (the tip when it is full)
+    """
+    corner = geometry.goal_corners[player]
+    empty = boards[:, corner[:, 0], corner[:, 1]] == 0
+    return np.where(empty.any(axis=1)[:, None], corner[np.argmax(empty, axis=1)], geometry.goal_tips[player])
+
+
+def average_distance_batch(table: np.ndarray, boards: np.ndarray, player: int, geometry: Geometry) -> np.ndarray:
+    """
+    Returns the average distance between the pegs of the player and its goal target on each board
+    :param table: distance table of the geometry (see peg_distances)
+    :return: (N,) average distances
+    """
+    targets = goal_targets_batch(boards, player, geometry)
+    pegs = boards == player
+    distances = table[targets[:, 0], targets[:, 1]]
+    return np.sum(distances * pegs, axis=(1, 2)) / np.sum(pegs, axis=(1, 2))
+
+
+def average_distance_to_each_corner_batch(table: np.ndarray, boards: np.ndarray, player: int,
+                                          geometry: Geometry) -> np.ndarray:
+    """
+    Returns the mean over the empty cells of the goal corner of the player of the average distance between its pegs
+    and the cell, on each board (0 when the goal corner is full)
+    :param table: distance table of the geometry (see peg_distances)
+    :return: (N,) mean distances
+    """
+    corner = geometry.goal_corners[player]
+    pegs = boards == player
+    # (N, k) sum of the distances between the pegs and each cell of the goal corner
+    sums = np.einsum('nxy,kxy->nk', pegs.astype(table.dtype), table[corner[:, 0], corner[:, 1]])
+    means = sums / np.sum(pegs, axis=(1, 2))[:, None]
+    empty = boards[:, corner[:, 0], corner[:, 1]] == 0
+    counts = np.sum(empty, axis=1)
+    return np.where(counts > 0, np.sum(means * empty, axis=1) / np.maximum(counts, 1), 0)
 
 
 class Heuristic(ABC):
+    """
+    Besides eval, a heuristic can be evaluated along a line of play: evaluation computes the data its value is
+    derived from, update turns the data of a state into the data of a child and value reads the value from the data.
+    Incremental heuristics update their data in O(1) from the moved peg - the others keep the player as data and
+    value evaluates the state from scratch.
+    """
+    incremental = False
+
     @abstractmethod
     def eval(self, state: State, player: int) -> float:
         raise NotImplemented
 
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        """
+        Evaluates a stack of boards at once - the heuristics of this module override it with vectorised NumPy,
+        the default evaluates the boards one by one with eval
+        :param boards: (N, B, B) stack of board matrices
+        :param player: the player for which the heuristic is evaluated
+        :param geometry: geometry of the boards, the diamond layout of their size by default
+        :return: (N,) values of the heuristic
+        """
+        geometry = batch_geometry(boards, geometry)
+        return np.array([self.eval(State(Board(geometry.triangle_size, matrix=board, layout=geometry.layout)), player)
+                         for board in boards], dtype=float).reshape(len(boards))
+
+    def evaluation(self, state: State, player: int) -> Any:
+        """
+        Data the value of the heuristic is derived from
+        :param state: the state to be evaluated
+        :param player: the player for which the heuristic is evaluated
+        :return: data to be passed to update and value - never modified in place
+        """
+        return player
+
+    def update(self, evaluation: Any, state: State, action: Action) -> Any:
+        """
+        Data of a child state
+        :param evaluation: data of the parent state
+        :param state: the child state - the parent state with the action applied
+        :param action: the applied action
+        :return: data of the child state
+        """
+        return evaluation
+
+    def value(self, evaluation: Any, state: State) -> float:
+        """
+        Value of the heuristic - matches eval up to the floating point rounding of the incremental sums
+        :param evaluation: data of the state
+        :param state: the evaluated state
+        :return: value of the heuristic
+        """
+        return self.eval(state, evaluation)
+
+
+class DistanceSumHeuristic(Heuristic, ABC):
+    """
+    Incremental heuristic derived from the sum of the distances between the pegs of a player and some target cells
+    of its goal corner - the targets only change when a peg enters or leaves the goal corner, and they are the
+    only thing recomputed from scratch.
+    """
+    incremental = True
+
+    @abstractmethod
+    def targets(self, board: Board, player: int) -> Tuple[Cell, ...]:
+        raise NotImplemented
+
+    @abstractmethod
+    def distances(self, geometry: Geometry) -> np.ndarray:
+        """
+        Distance table of the geometry the heuristic measures with (see Geometry.manhattan_distances)
+        """
+        raise NotImplemented
+
+    @abstractmethod
+    def normalised(self, mean: float, state: State) -> float:
+        """
+        Value of the heuristic from the mean distance between the pegs and the targets
+        """
+        raise NotImplemented
+
+    def evaluation(self, state: State, player: int) -> Tuple[int, Tuple[Cell, ...], float, int]:
+        targets = self.targets(state.board, player)
+        table = self.distances(state.board.geometry)
+        indices = peg_indices(state.board, player)
+        total = sum(table[target][indices[:, 0], indices[:, 1]].sum().item() for target in targets)
+        return player, targets, total, len(indices)
+
+    def update(self, evaluation: Tuple[int, Tuple[Cell, ...], float, int], state: State,
+               action: Action) -> Tuple[int, Tuple[Cell, ...], float, int]:
+        player, targets, total, count = evaluation
+        corner_of = state.board.geometry.corner_of
+        if (corner_of[action.src] == player or corner_of[action.dest] == player) and \
+                self.targets(state.board, player) != targets:
+            return self.evaluation(state, player)
+        if moved_peg(state, action, player):
+            table = self.distances(state.board.geometry)
+            for target in targets:
+                distances = table[target]
+                total += (distances[action.dest] - distances[action.src]).item()
+            return player, targets, total, count
+        return evaluation
+
+    def value(self, evaluation: Tuple[int, Tuple[Cell, ...], float, int], state: State) -> float:
+        _, targets, total, count = evaluation
+        return self.normalised(total / (len(targets) * count) if targets else 0, state)
+
 
 class NoneHeuristic(Heuristic):
     """
     A heuristic that always returns 0
     """
+    incremental = True
+
     def eval(self, state: State, player: int) -> float:
         return 0
 
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        return np.zeros(len(boards))
+
+    def value(self, evaluation: Any, state: State) -> float:
+        return 0
+
 
 class EnsuredNormalizedHeuristic(Heuristic):
     """
@@ -97,13 +305,72 @@ class EnsuredNormalizedHeuristic(Heuristic):
     """
     def __init__(self, inner_heuristic: Heuristic):
         self.inner_heuristic = inner_heuristic
+        self.incremental = inner_heuristic.incremental
 
     def eval(self, state: State, player: int) -> float:
-        value = self.inner_heuristic.eval(state, player)
+        return self._ensured(self.inner_heuristic.eval(state, player))
+
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        values = self.inner_heuristic.eval_batch(boards, player, geometry)
+        assert np.all((-0.001 <= values) & (values <= 1)), \
+            f'{type(self.inner_heuristic).__name__}: Assertion -0.001 <= {values.min()}, {values.max()} <= 1 Failed'
+        return values
+
+    def evaluation(self, state: State, player: int) -> Any:
+        return self.inner_heuristic.evaluation(state, player)
+
+    def update(self, evaluation: Any, state: State, action: Action) -> Any:
+        return self.inner_heuristic.update(evaluation, state, action)
+
+    def value(self, evaluation: Any, state: State) -> float:
+        return self._ensured(self.inner_heuristic.value(evaluation, state))
+
+    def _ensured(self, value: float) -> float:
         assert -0.001 <= value <= 1, f'{type(self.inner_heuristic).__name__}: Assertion -0.001 <= {value} <= 1 Failed'
         return value
 
 
+class CachedHeuristic(Heuristic):
+    """
+    Utility to memoise the inner heuristic - bounded LRU cache of its values keyed by the Zobrist key of the board
+    and the player, so transposed positions are evaluated once.
+    Usage: CachedHeuristic(SomeOtherHeuristic(), max_size=100000).eval(state, player)
+    Incremental inner heuristics are cheaper to update than to look up - their evaluation data bypasses the cache.
+    """
+    def __init__(self, inner_heuristic: Heuristic, max_size: int = 100000):
+        """
+        :param inner_heuristic: the memoised heuristic
+        :param max_size: maximal number of cached values
+        """
+        self.inner_heuristic = inner_heuristic
+        self.cache = LRUCache(max_size)
+        self.incremental = inner_heuristic.incremental
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cache.hit_rate
+
+    def eval(self, state: State, player: int) -> float:
+        key = (state.board.zobrist, player)
+        value = self.cache.get(key)
+        if value is None:
+            value = self.inner_heuristic.eval(state, player)
+            self.cache.put(key, value)
+        return value
+
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        return self.inner_heuristic.eval_batch(boards, player, geometry)
+
+    def evaluation(self, state: State, player: int) -> Any:
+        return self.inner_heuristic.evaluation(state, player) if self.incremental else player
+
+    def update(self, evaluation: Any, state: State, action: Action) -> Any:
+        return self.inner_heuristic.update(evaluation, state, action) if self.incremental else evaluation
+
+    def value(self, evaluation: Any, state: State) -> float:
+        return self.inner_heuristic.value(evaluation, state) if self.incremental else self.eval(state, evaluation)
+
+
 class WeightedHeuristic(Heuristic):
     """
     Utility to combine multiple heuristics with different weights.
@@ -113,22 +380,76 @@ class WeightedHeuristic(Heuristic):
         total_weights = sum(weight for _, weight in weighted_heuristics)
         if total_weights != 1:
             raise ValueError(f'Total weights must be 1')
+        self.incremental = all(heuristic.incremental for heuristic, _ in weighted_heuristics)
+        # Fused evaluator: the heuristics of FUSED_TERMS are computed inline from inputs shared by all of them
+        self._terms = [(heuristic, weight, FUSED_TERMS.get(type(heuristic)))
+                       for heuristic, weight in weighted_heuristics]
+        self._tables = {term for _, _, term in self._terms if term in ('manhattan', 'euclidean', 'hex')}
+        if 'max' in {term for _, _, term in self._terms}:
+            self._tables.add('manhattan')
 
     def eval(self, state: State, player: int) -> float:
         """
         Combine the weighted heuristics.
         Round the values so that the AI doesn't differentiate between very small numbers.
+        The pegs, the goal target and the distances of each family are read once for all the fused heuristics -
+        each term computes the same value as the eval of its heuristic.
         :param state: the current state of the game
         :param player: the player for which the heuristic is evaluated
         :return: value of the combined heuristic
         """
+        board = state.board
+        geometry = board.geometry
+        cells = board.peg_cells(player)
+        distances = {}
+        if self._tables:
+            # Read with peg_at - a BitBoard rebuilds its matrix on each read
+            target = goal_target(board, player)
+            indices = np.array(cells, dtype=int).reshape(-1, 2)
+            # sum / count is the computation of np.mean, without its dispatch overhead
+            count = len(indices)
+            for name in self._tables:
+                table = getattr(geometry, f'{name}_distances')
+                distances[name] = table[target[0], target[1]][indices[:, 0], indices[:, 1]]
+
         total = 0
+        for heuristic, weight, term in self._terms:
+            if term is None:
+                value = heuristic.eval(state, player)
+            elif term == 'pegs':
+                corner_of = geometry.corner_of
+                pegs = sum(corner_of[cell] == player for cell in cells)
+                value = pegs / ((board.triangle_size + 1) * board.triangle_size / 2)
+            elif term == 'euclidean':
+                value = 1 - distances['euclidean'].sum() / count / initial_avg_euclidean(board)
+            elif term == 'max':
+                value = 1 - distances['manhattan'].max() / (2 * board.board_size)
+            else:
+                value = 1 - distances[term].sum() / count / (2 * board.board_size)
+            total += round(value, 4) * weight
+        return total
+
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        total = np.zeros(len(boards))
         for heuristic, weight in self.weighted_heuristics:
-            total += round(heuristic.eval(state, player), 4) * weight
+            total += np.round(heuristic.eval_batch(boards, player, geometry), 4) * weight
+        return total
+
+    def evaluation(self, state: State, player: int) -> Tuple[Any, ...]:
+        return tuple(heuristic.evaluation(state, player) for heuristic, _ in self.weighted_heuristics)
+
+    def update(self, evaluation: Tuple[Any, ...], state: State, action: Action) -> Tuple[Any, ...]:
+        return tuple(heuristic.update(inner, state, action)
+                     for (heuristic, _), inner in zip(self.weighted_heuristics, evaluation))
+
+    def value(self, evaluation: Tuple[Any, ...], state: State) -> float:
+        total = 0
+        for (heuristic, weight), inner in zip(self.weighted_heuristics, evaluation):
+            total += round(heuristic.value(inner, state), 4) * weight
         return total
 
 
-class AverageManhattanToCornerHeuristic(Heuristic):
+class AverageManhattanToCornerHeuristic(DistanceSumHeuristic):
     def eval(self, state: State, player: int) -> float:
         """
         Consider Manhattan distance towards the goal corner of each player - normalize the distance by 2 board size
@@ -136,34 +457,70 @@ class AverageManhattanToCornerHeuristic(Heuristic):
         """
         return 1 - average_manhattan_to_corner(state.board, player) / (2 * state.board.board_size)
 
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        geometry = batch_geometry(boards, geometry)
+        distances = average_distance_batch(geometry.manhattan_distances, boards, player, geometry)
+        return 1 - distances / (2 * geometry.board_size)
+
+    def targets(self, board: Board, player: int) -> Tuple[Cell, ...]:
+        return goal_target(board, player),
 
-class AverageManhattanToEachCornerHeuristic(Heuristic):
+    def distances(self, geometry: Geometry) -> np.ndarray:
+        return geometry.manhattan_distances
+
+    def normalised(self, mean: float, state: State) -> float:
+        return 1 - mean / (2 * state.board.board_size)
+
+
+class AverageHexToCornerHeuristic(DistanceSumHeuristic):
     """
-    Computes the average Manhattan distance to the non-occupied corners.
+    AverageManhattanToCornerHeuristic with the number of crawls between the cells instead of the Manhattan distance -
+    the Manhattan distance counts two steps for the diagonal crawls (-1, -1) and (1, 1)
     """
     def eval(self, state: State, player: int) -> float:
-        if player == 1:
-            corners = top_right_corner_coords(state.board.triangle_size, state.board.board_size)
-        else:
-            corners = bot_left_corner_coords(state.board.triangle_size, state.board.board_size)
+        return 1 - average_hex_to_corner(state.board, player) / (2 * state.board.board_size)
 
-        indices = np.argwhere(state.board.matrix == player)
-        total = 0
-        considered_corners_count = 0
-        for corner in corners:
-            if state.board.matrix[corner[0], corner[1]] == 0:
-                distances = np.sum(np.abs(indices - corner), axis=1)
-                total += np.mean(distances)
-                considered_corners_count += 1
-
-        if considered_corners_count == 0:
-            total_mean = 0
-        else:
-            total_mean = total / considered_corners_count
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        geometry = batch_geometry(boards, geometry)
+        distances = average_distance_batch(geometry.hex_distances, boards, player, geometry)
+        return 1 - distances / (2 * geometry.board_size)
+
+    def targets(self, board: Board, player: int) -> Tuple[Cell, ...]:
+        return goal_target(board, player),
+
+    def distances(self, geometry: Geometry) -> np.ndarray:
+        return geometry.hex_distances
+
+    def normalised(self, mean: float, state: State) -> float:
+        return 1 - mean / (2 * state.board.board_size)
+
+
+class AverageManhattanToEachCornerHeuristic(DistanceSumHeuristic):
+    """
+    Computes the average Manhattan distance to the non-occupied corners.
+    """
+    def eval(self, state: State, player: int) -> float:
+        total_mean = average_distance_to_each_corner(state.board.geometry.manhattan_distances, state.board, player)
         return 1 - total_mean / (2 * state.board.board_size)
 
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        geometry = batch_geometry(boards, geometry)
+        distances = average_distance_to_each_corner_batch(geometry.manhattan_distances, boards, player, geometry)
+        return 1 - distances / (2 * geometry.board_size)
+
+    def targets(self, board: Board, player: int) -> Tuple[Cell, ...]:
+        return empty_goal_cells(board, player)
+
+    def distances(self, geometry: Geometry) -> np.ndarray:
+        return geometry.manhattan_distances
+
+    def normalised(self, mean: float, state: State) -> float:
+        return 1 - mean / (2 * state.board.board_size)
+
 
 class SumOfPegsInCornerHeuristic(Heuristic):
+    incremental = True
+
     def eval(self, state: State, player: int) -> float:
         """
         Consider the sum of pegs of the player - normalize the sum by the peg count for each player
@@ -171,8 +528,27 @@ class SumOfPegsInCornerHeuristic(Heuristic):
         peg_count = (state.board.triangle_size + 1) * state.board.triangle_size / 2
         return sum_player_pegs(state.board, player) / peg_count
 
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        geometry = batch_geometry(boards, geometry)
+        peg_count = (geometry.triangle_size + 1) * geometry.triangle_size / 2
+        return np.sum(boards[:, geometry.goal_masks[player]] == player, axis=1) / peg_count
+
+    def evaluation(self, state: State, player: int) -> Tuple[int, int]:
+        return player, int(sum_player_pegs(state.board, player))
 
-class AverageEuclideanToCornerHeuristic(Heuristic):
+    def update(self, evaluation: Tuple[int, int], state: State, action: Action) -> Tuple[int, int]:
+        player, pegs = evaluation
+        if not moved_peg(state, action, player):
+            return evaluation
+        corner_of = state.board.geometry.corner_of
+        return player, pegs + (corner_of[action.dest] == player) - (corner_of[action.src] == player)
+
+    def value(self, evaluation: Tuple[int, int], state: State) -> float:
+        peg_count = (state.board.triangle_size + 1) * state.board.triangle_size / 2
+        return evaluation[1] / peg_count
+
+
+class AverageEuclideanToCornerHeuristic(DistanceSumHeuristic):
     def eval(self, state: State, player: int) -> float:
         """
         Consider the Euclidean distance towards the goal corner of each player - normalize the distance by the initial
@@ -182,40 +558,117 @@ class AverageEuclideanToCornerHeuristic(Heuristic):
         initial_euclidean = initial_avg_euclidean(state.board)
         return 1 - average_euclidean_to_corner(state.board, player) / initial_euclidean
 
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        geometry = batch_geometry(boards, geometry)
+        distances = average_distance_batch(geometry.euclidean_distances, boards, player, geometry)
+        return 1 - distances / geometry.initial_avg_euclidean
+
+    def targets(self, board: Board, player: int) -> Tuple[Cell, ...]:
+        return goal_target(board, player),
 
-class AverageEuclideanToEachCornerHeuristic(Heuristic):
+    def distances(self, geometry: Geometry) -> np.ndarray:
+        return geometry.euclidean_distances
+
+    def normalised(self, mean: float, state: State) -> float:
+        return 1 - mean / initial_avg_euclidean(state.board)
+
+
+class AverageEuclideanToEachCornerHeuristic(DistanceSumHeuristic):
     def eval(self, state: State, player: int) -> float:
         """
         AverageEuclideanToCornerHeuristic but does a mean of the distance to each corner.
         Computes the average Euclidean distance to the non-occupied corners.
         """
         initial_euclidean = initial_avg_euclidean(state.board)
-
-        if player == 1:
-            corners = top_right_corner_coords(state.board.triangle_size, state.board.board_size)
-        else:
-            corners = bot_left_corner_coords(state.board.triangle_size, state.board.board_size)
-        indices = np.argwhere(state.board.matrix == player)
-
-        means = 0
-        considered_corners_count = 0
-        for corner in corners:
-            if state.board.matrix[corner[0], corner[1]] == 0:
-                distances = np.linalg.norm(indices - corner, axis=1)
-                means += np.mean(distances)
-                considered_corners_count += 1
-
-        if considered_corners_count == 0:
-            final_mean = 0
-        else:
-            final_mean = means / considered_corners_count
+        final_mean = average_distance_to_each_corner(state.board.geometry.euclidean_distances, state.board, player)
         return 1 - final_mean / initial_euclidean
 
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        geometry = batch_geometry(boards, geometry)
+        distances = average_distance_to_each_corner_batch(geometry.euclidean_distances, boards, player, geometry)
+        return 1 - distances / geometry.initial_avg_euclidean
+
+    def targets(self, board: Board, player: int) -> Tuple[Cell, ...]:
+        return empty_goal_cells(board, player)
+
+    def distances(self, geometry: Geometry) -> np.ndarray:
+        return geometry.euclidean_distances
+
+    def normalised(self, mean: float, state: State) -> float:
+        return 1 - mean / initial_avg_euclidean(state.board)
+
 
 class MaxManhattanToCornerHeuristic(Heuristic):
     """
     Consider the maximal Manhattan distance towards the goal corner of each player - normalize the distance by 2
     board size - helps to avoid the player from leaving pegs behind and carry them together towards the goal
     """
+    incremental = True
+
     def eval(self, state: State, player: int) -> float:
         return 1 - max_manhattan_to_corner(state.board, player) / (2 * state.board.board_size)
+
+    def eval_batch(self, boards: np.ndarray, player: int, geometry: Optional[Geometry] = None) -> np.ndarray:
+        geometry = batch_geometry(boards, geometry)
+        targets = goal_targets_batch(boards, player, geometry)
+        distances = geometry.manhattan_distances[targets[:, 0], targets[:, 1]]
+        farthest = np.max(np.where(boards == player, distances, -1), axis=(1, 2))
+        return 1 - farthest / (2 * geometry.board_size)
+
+    def evaluation(self, state: State, player: int) -> Tuple[int, Cell, Tuple[int, ...]]:
+        """
+        Data of the state: the player, its goal target and the number of its pegs at each Manhattan distance
+        """
+        target = goal_target(state.board, player)
+        distances = state.board.geometry.manhattan_distances[target]
+        counts = [0] * (2 * state.board.board_size)
+        for cell in state.board.peg_cells(player):
+            counts[distances[cell]] += 1
+        return player, target, tuple(counts)
+
+    def update(self, evaluation: Tuple[int, Cell, Tuple[int, ...]], state: State,
+               action: Action) -> Tuple[int, Cell, Tuple[int, ...]]:
+        player, target, counts = evaluation
+        corner_of = state.board.geometry.corner_of
+        if (corner_of[action.src] == player or corner_of[action.dest] == player) and \
+                goal_target(state.board, player) != target:
+            return self.evaluation(state, player)
+        if not moved_peg(state, action, player):
+            return evaluation
+        distances = state.board.geometry.manhattan_distances[target]
+        counts = list(counts)
+        counts[distances[action.src]] -= 1
+        counts[distances[action.dest]] += 1
+        return player, target, tuple(counts)
+
+    def value(self, evaluation: Tuple[int, Cell, Tuple[int, ...]], state: State) -> float:
+        counts = evaluation[2]
+        farthest = next((distance for distance in range(len(counts) - 1, -1, -1) if counts[distance]), 0)
+        return 1 - farthest / (2 * state.board.board_size)
+
+
+class PatternDatabaseHeuristic(Heuristic):
+    """
+    Consider the number of turns the pegs of the player still need, estimated by a pattern database (see
+    PatternDatabase.turns) - normalize the turns by the estimate of the initial position
+    Subtract the normalized turns from 1 to get a heuristic that is higher when closer to the goal
+    """
+    def __init__(self, database: PatternDatabase):
+        """
+        :param database: pattern database built for the board of the evaluated states
+        """
+        self.database = database
+
+    def eval(self, state: State, player: int) -> float:
+        turns = self.database.turns(state.board.peg_cells(player), player)
+        return max(0.0, 1 - turns / self.database.initial_turns)
+
+
+# Heuristics WeightedHeuristic.eval computes inline, by the term of its fused evaluator
+FUSED_TERMS = {
+    SumOfPegsInCornerHeuristic: 'pegs',
+    AverageManhattanToCornerHeuristic: 'manhattan',
+    AverageHexToCornerHeuristic: 'hex',
+    AverageEuclideanToCornerHeuristic: 'euclidean',
+    MaxManhattanToCornerHeuristic: 'max',
+}
@@ -0,0 +1,166 @@
+from collections import deque
+from functools import cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from game.Action import Action
+from game.Geometry import Geometry, board_geometry
+from game.State import State
+from game.Step import Step
+from game_problem.ChineseCheckers import ChineseCheckers, UndoToken
+
+
+class TurnCodes:
+    """
+    Dense index of the turn actions of a board - a turn is identified by its source and destination cells, as a
+    destination next to the source is a crawl and any other one the end of a jump chain
+    """
+    def __init__(self, geometry: Geometry):
+        self.turns: List[Action] = [
+            Action(src, dest, Step.CRAWL if dest in geometry.neighbours[src] else Step.JUMP)
+            for src in geometry.cells for dest in geometry.cells if dest != src]
+        self.codes: Dict[Tuple[Tuple[int, int], Tuple[int, int]], int] = {
+            (action.src, action.dest): code for code, action in enumerate(self.turns)}
+
+
+@cache
+def turn_codes(triangle_size: int, layout: str = 'diamond') -> TurnCodes:
+    return TurnCodes(board_geometry(triangle_size, layout))
+
+
+class MacroChineseCheckers(ChineseCheckers):
+    """
+    Chinese Checkers where a whole turn is a single action - a crawl, or a chain of jumps collapsed into
+    one action from the first source to the final destination (step_type JUMP).
+    Every action ends the turn, so the states of this problem are always in the END mode.
+    """
+    def _destinations(self, state: State, src: Tuple[int, int]) -> Dict[Tuple[int, int], Tuple[int, int]]:
+        """
+        BFS over the jump graph of a peg - every cell reachable by a chain of jumps, reached once
+        :param state: current state of the game
+        :param src: the selected peg coordinate pair
+        :return: dictionary of reachable cells mapped to the cell they were jumped from
+        """
+        geometry = state.board.geometry
+        matrix = state.board.matrix
+        parents = {src: None}
+        queue = deque([src])
+        while queue:
+            cell = queue.popleft()
+            for landing, over in geometry.jumps[cell].items():
+                # Each cell is expanded once: the cells already in parents (the source included) are not landed on
+                # again. The moving peg has left its source cell, so the source cannot be jumped over either
+                if landing not in parents and over != src and matrix[over] != 0 and matrix[landing] == 0:
+                    parents[landing] = cell
+                    queue.append(landing)
+        # The source is where the BFS starts, not a destination of the turn
+        del parents[src]
+        return parents
+
+    def _peg_turns(self, state: State, src: Tuple[int, int]) -> Iterable[Action]:
+        """
+        Generate every distinct destination of a peg in one turn - crawls first, then jump chains in BFS order
+        :param state: current state of the game
+        :param src: the selected peg coordinate pair
+        :return: an iterable of turn actions
+        """
+        matrix = state.board.matrix
+        crawls = [dest for dest in state.board.geometry.neighbours[src] if matrix[dest] == 0]
+        for dest in crawls:
+            yield Action(src, dest, Step.CRAWL)
+        for dest in self._destinations(state, src):
+            if dest not in crawls:
+                yield Action(src, dest, Step.JUMP)
+
+    def actions(self, state: State, encoded: bool = False, cached: bool = True) -> Iterable:
+        """
+        Generate all possible turns for the current state (turns are not kept by the move cache)
+        :param state: current state of the game
+        :param encoded: flag to get the turn codes of the actions (see TurnCodes) instead of Action objects
+        :param cached: ignored
+        :return: an iterable of turn actions
+        """
+        turns = (action for peg in state.board.peg_cells(state.player) for action in self._peg_turns(state, peg))
+        return self._encoded(turns) if encoded else turns
+
+    def _encoded(self, actions: Iterable[Action]) -> Iterable[int]:
+        codes = turn_codes(self.triangle_size, self.layout).codes
+        return (codes[action.src, action.dest] for action in actions)
+
+    def encode(self, action: Action) -> int:
+        """
+        Dense turn code of an action - its index in TurnCodes.turns
+        """
+        return turn_codes(self.triangle_size, self.layout).codes[action.src, action.dest]
+
+    def decode(self, code: int) -> Action:
+        """
+        Turn action of a dense turn code
+        """
+        return turn_codes(self.triangle_size, self.layout).turns[code]
+
+    def move_table(self, geometry: Geometry) -> List[Action]:
+        return turn_codes(geometry.triangle_size, geometry.layout).turns
+
+    def max_actions(self, geometry: Geometry) -> int:
+        # Every peg of the player reaching every other cell of the board in one turn
+        return geometry.corner_size * (len(geometry.cells) - geometry.corner_size)
+
+    @staticmethod
+    def _is_forward(player: int, action: Action) -> bool:
+        # Same direction rule as ChineseCheckers, applied to the whole turn
+        (src_x, src_y), (dest_x, dest_y) = action.src, action.dest
+        if player == 1:
+            return (dest_x < src_x and dest_y >= src_y) or (dest_x <= src_x and dest_y > src_y)
+        return (dest_x > src_x and dest_y <= src_y) or (dest_x >= src_x and dest_y < src_y)
+
+    def forward_actions(self, state: State, encoded: bool = False, cached: bool = True) -> Iterable:
+        """
+        Generate the turns that make the player move forward (same direction rule as ChineseCheckers)
+        :param state: current state of the game
+        :param encoded: flag to get the turn codes of the actions (see TurnCodes) instead of Action objects
+        :param cached: ignored
+        :return: an iterable of turn actions
+        """
+        turns = (action for action in self.actions(state) if self._is_forward(state.player, action))
+        return self._encoded(turns) if encoded else turns
+
+    def forward_and_all_actions(self, state: State, encoded: bool = False,
+                                cached: bool = True) -> Tuple[List, List]:
+        actions = list(self.actions(state))
+        forward = [action for action in actions if self._is_forward(state.player, action)]
+        if encoded:
+            return list(self._encoded(forward)), list(self._encoded(actions))
+        return forward, actions
+
+    def steps(self, state: State, action: Action) -> List[Action]:
+        """
+        Expand a turn action into the step actions of ChineseCheckers, e.g. to play it in the step model
+        :param state: the state the turn action is taken from
+        :param action: turn action
+        :return: list of step actions - a crawl, or jumps followed by an END
+        """
+        if action.step_type == Step.CRAWL:
+            return [action]
+        parents = self._destinations(state, action.src)
+        path = [action.dest]
+        while path[-1] != action.src:
+            path.append(parents[path[-1]])
+        path.reverse()
+        jumps = [Action(src, dest, Step.JUMP) for src, dest in zip(path, path[1:])]
+        return jumps + [Action(action.dest, action.dest, Step.END)]
+
+    @staticmethod
+    def _child_modes(actions: Sequence[Action]) -> np.ndarray:
+        # Every turn ends in the END mode (see apply), so that results switches the player and clears the visited cells
+        return np.full(len(actions), Step.END, dtype=np.int8)
+
+    def apply(self, state: State, action: Action) -> UndoToken:
+        undo_token = (action, state.player, state.mode, state.peg, state.visited)
+        state.board.move(action.src, action.dest)
+        state.mode = Step.END
+        state.peg = action.dest
+        state.visited = ()
+        state.player = 3 - state.player
+        return undo_token
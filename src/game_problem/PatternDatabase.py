@@ -0,0 +1,160 @@
+import os
+import sys
+from collections import deque
+from itertools import combinations
+from math import comb
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+if __name__ == "__main__":
+    sys.path.append("src")
+
+from game.Geometry import Cell, Geometry, board_geometry
+
+UNREACHABLE = 255
+
+
+class PatternDatabase:
+    """
+    Exact minimal number of turns (a crawl or a chain of jumps) a small group of pegs needs to get inside the goal
+    corner when it is alone on the board - one table per group size, indexed by the combinatorial rank of the cells
+    of the group. The tables are built for player 1, player 2 reads them through the half turn of the board.
+    """
+    def __init__(self, geometry: Geometry, tables: Dict[int, np.ndarray]):
+        """
+        :param geometry: geometry of the board the tables were built on
+        :param tables: table of each group size (see build_table)
+        """
+        self.geometry = geometry
+        self.tables = tables
+        self.group_size = max(tables)
+        # Dense index of each cell - the half turn of the board maps the index i to len(cells) - 1 - i
+        self.index: Dict[Cell, int] = {cell: i for i, cell in enumerate(geometry.cells)}
+        self.binomials = [[comb(n, k) for k in range(self.group_size + 1)] for n in range(len(geometry.cells))]
+        # Estimate of the initial position, used to normalize the heuristic
+        self.initial_turns = self.turns(geometry.goal_cells[2], 1)
+
+    @classmethod
+    def build(cls, triangle_size: int, group_size: int, layout: str = 'diamond') -> 'PatternDatabase':
+        """
+        Builds the tables of every group size up to group_size
+        :param triangle_size: size of the triangles of the board
+        :param group_size: maximal number of pegs of a group
+        :param layout: layout of the board (see Geometry)
+        :return: the pattern database
+        """
+        geometry = board_geometry(triangle_size, layout)
+        return cls(geometry, {size: build_table(geometry, size) for size in range(1, group_size + 1)})
+
+    def save(self, directory: str):
+        """
+        Writes one .npy file per group size in the directory
+        """
+        os.makedirs(directory, exist_ok=True)
+        for size, table in self.tables.items():
+            np.save(table_path(directory, self.geometry, size), table)
+
+    @classmethod
+    def load(cls, directory: str, triangle_size: int, group_size: int, layout: str = 'diamond',
+             mmap: bool = True) -> 'PatternDatabase':
+        """
+        Reads the tables written by save
+        :param mmap: flag indicating if the tables are memory-mapped instead of read in memory
+        :return: the pattern database
+        """
+        geometry = board_geometry(triangle_size, layout)
+        return cls(geometry, {size: np.load(table_path(directory, geometry, size), mmap_mode='r' if mmap else None)
+                              for size in range(1, group_size + 1)})
+
+    def rank(self, indices: Sequence[int]) -> int:
+        """
+        Combinatorial rank of a group of cells
+        :param indices: dense indices of the cells, in increasing order
+        :return: index of the group in the table of its size
+        """
+        return sum(self.binomials[index][k + 1] for k, index in enumerate(indices))
+
+    def turns(self, cells: Iterable[Cell], player: int) -> int:
+        """
+        Estimate of the number of turns the pegs of a player need to fill the goal corner: the pegs are split in
+        groups of group_size in row-major order (from the goal of player 1), and the exact numbers of turns of the
+        groups are added up
+        :param cells: cells of the pegs of the player
+        :param player: the player the pegs belong to
+        :return: number of turns
+        """
+        last = len(self.geometry.cells) - 1
+        indices = sorted(self.index[cell] if player == 1 else last - self.index[cell] for cell in cells)
+        total = 0
+        for start in range(0, len(indices), self.group_size):
+            group = indices[start:start + self.group_size]
+            total += int(self.tables[len(group)][self.rank(group)])
+        return total
+
+
+def table_path(directory: str, geometry: Geometry, size: int) -> str:
+    return os.path.join(directory, f'{geometry.layout}-{geometry.triangle_size}-{size}.npy')
+
+
+def turn_destinations(geometry: Geometry, occupied: Iterable[Cell], src: Cell) -> List[Cell]:
+    """
+    Every cell a peg can reach in one turn - crawls and chains of jumps over the other pegs
+    :param geometry: geometry of the board
+    :param occupied: cells of the other pegs
+    :param src: cell of the moving peg
+    :return: list of destinations
+    """
+    occupied = set(occupied)
+    destinations = [dest for dest in geometry.neighbours[src] if dest not in occupied]
+    reached = {src}
+    queue = deque([src])
+    while queue:
+        cell = queue.popleft()
+        for landing, over in geometry.jumps[cell].items():
+            if landing not in reached and over in occupied and landing not in occupied:
+                reached.add(landing)
+                queue.append(landing)
+    reached.discard(src)
+    return destinations + [dest for dest in reached if dest not in destinations]
+
+
+def build_table(geometry: Geometry, size: int) -> np.ndarray:
+    """
+    Minimal number of turns of every group of pegs of player 1 - retrograde breadth-first search from the groups
+    inside the goal corner, a turn being reversible (the other pegs of the group do not move)
+    :param geometry: geometry of the board
+    :param size: number of pegs of the groups
+    :return: uint8 table indexed by the combinatorial rank of the groups (UNREACHABLE for unreachable groups)
+    """
+    cells = geometry.cells
+    index = {cell: i for i, cell in enumerate(cells)}
+
+    def rank(group: Tuple[int, ...]) -> int:
+        return sum(comb(i, k + 1) for k, i in enumerate(group))
+
+    table = np.full(comb(len(cells), size), UNREACHABLE, dtype=np.uint8)
+    goal = sorted(index[cell] for cell in geometry.goal_cells[1])
+    queue = deque()
+    for group in combinations(goal, size):
+        table[rank(group)] = 0
+        queue.append(group)
+    while queue:
+        group = queue.popleft()
+        turns = table[rank(group)] + 1
+        for moving in range(size):
+            others = group[:moving] + group[moving + 1:]
+            for dest in turn_destinations(geometry, (cells[i] for i in others), cells[group[moving]]):
+                child = tuple(sorted(others + (index[dest],)))
+                child_rank = rank(child)
+                if table[child_rank] == UNREACHABLE:
+                    table[child_rank] = turns
+                    queue.append(child)
+    return table
+
+
+if __name__ == "__main__":
+    # python src/game_problem/PatternDatabase.py <triangle size> <group size> <directory> [layout]
+    database = PatternDatabase.build(int(sys.argv[1]), int(sys.argv[2]), *sys.argv[4:5])
+    database.save(sys.argv[3])
+    print({size: int(np.max(table[table != UNREACHABLE])) for size, table in database.tables.items()})
@@ -15,18 +15,20 @@ from players.Player import Player
 
 
 class TranspositionTableAMAF:
-    def __init__(self, MaxLegalMoves, BoardLength) -> None:
+    def __init__(self) -> None:
         self.T = {}
-        self.MaxLegalMoves = MaxLegalMoves
-        self.BoardLength = BoardLength
-        self.CodeMaxLegalMoves = BoardLength**4 * 3
-
-    def addAMAF(self, state: State):
-        nplayouts = [0.0 for x in range(self.MaxLegalMoves)]
-        nwins = [0.0 for x in range(self.MaxLegalMoves)]
-        nplayoutsAMAF = [0.0 for x in range(self.CodeMaxLegalMoves)]
-        nwinsAMAF = [0.0 for x in range(self.CodeMaxLegalMoves)]
-        visited = [False for x in range(self.MaxLegalMoves)]
+
+    def addAMAF(self, problem: ChineseCheckers, state: State):
+        geometry = state.board.geometry
+        # Large enough for every position of the board (see ChineseCheckers.max_actions)
+        size = problem.max_actions(geometry)
+        # AMAF statistics are indexed by the dense move codes of the problem (see ChineseCheckers.move_table)
+        code_size = len(problem.move_table(geometry))
+        nplayouts = [0.0 for x in range(size)]
+        nwins = [0.0 for x in range(size)]
+        nplayoutsAMAF = [0.0 for x in range(code_size)]
+        nwinsAMAF = [0.0 for x in range(code_size)]
+        visited = [False for x in range(size)]
         self.T[hash(state)] = [0, nplayouts, nwins, nplayoutsAMAF, nwinsAMAF, visited]
 
     def updateAMAF(self, t, played, res):
@@ -38,45 +40,40 @@ class TranspositionTableAMAF:
     def look(self, state):
         return self.T.get(hash(state), None)
 
-    def tocode(self, action):
-        return (action.step_type - 1) + 3 * (
-            (action.src[0] * self.BoardLength + action.src[1]) * self.BoardLength**2
-            + action.dest[0] * self.BoardLength
-            + action.dest[1]
-        )
-
 
 class GRAVEPlayer(Player):
     """
     Random player (confused AI) - selects an action randomly from the list of valid actions
     """
 
-    def __init__(self, nb, player, MaxLegalMoves=60, BoardLength=7, min_visit=50):
+    def __init__(self, nb, player, min_visit=50):
         super().__init__()
         self._player_type = "GRAVE"
-        self.T = TranspositionTableAMAF(MaxLegalMoves, BoardLength)
+        self.T = TranspositionTableAMAF()
         self.nb = nb  # number of playouts done before choosing a move
         self.min_visit = min_visit  # GRAVE hyperparameter
         self.player = player
 
     def playoutAMAF(self, problem: GameProblem, state: State, played) -> int:
         new_state = state.copy()
+        moves = problem.move_table(new_state.board.geometry)
         while not problem.terminal_test(new_state):
-            action = random.choice(list(problem.actions(new_state)))
-            new_state = problem.result(new_state, action)
-            played.append(self.T.tocode(action))
+            code = random.choice(list(problem.actions(new_state, encoded=True, cached=False)))
+            problem.apply(new_state, moves[code])
+            played.append(code)
         return (problem.utility(new_state, state.player) + 1) / 2, played
 
     def forward_playoutAMAF(self, problem: GameProblem, state: State, played) -> int:
         new_state = state.copy()
+        moves = problem.move_table(new_state.board.geometry)
         while not problem.terminal_test(new_state):
-            moves = list(problem.forward_actions(new_state))
+            codes = list(problem.forward_actions(new_state, encoded=True, cached=False))
 
-            if len(moves) == 0:
-                moves = list(problem.actions(new_state))
-            action = random.choice(moves)
-            new_state = problem.result(new_state, action)
-            played.append(self.T.tocode(action))
+            if len(codes) == 0:
+                codes = list(problem.actions(new_state, encoded=True, cached=False))
+            code = random.choice(codes)
+            problem.apply(new_state, moves[code])
+            played.append(code)
         return (problem.utility(new_state, state.player) + 1) / 2, played
 
     def searchGRAVE(self, problem: GameProblem, state: State, played, tref):
@@ -89,11 +86,11 @@ class GRAVEPlayer(Player):
                 tr = t
             bestValue = 0
             best = 0
-            moves = list(problem.actions(state))
-            bestcode = self.T.tocode(moves[0])
-            for i in range(0, len(moves)):
+            codes = list(problem.actions(state, encoded=True))
+            bestcode = codes[0]
+            for i in range(0, len(codes)):
                 val = 1000000.0
-                code = self.T.tocode(moves[i])
+                code = codes[i]
                 n = t[0]
                 ni = t[1][i]
                 wi = t[2][i]
@@ -119,11 +116,12 @@ class GRAVEPlayer(Player):
                     best = i
                     bestcode = code
 
-            state = problem.result(state, moves[best])
+            undo_token = problem.apply(state, problem.move_table(state.board.geometry)[bestcode])
             played.append(bestcode)
-            t[3][best] = True  # Useless to visit same node twice in a same descent
+            t[5][best] = True  # Useless to visit same node twice in a same descent
             res = self.searchGRAVE(problem, state, played, tr)
-            t[3][best] = False
+            problem.undo(state, undo_token)
+            t[5][best] = False
             t[0] += 1
             t[1][best] += 1
             t[2][best] += res[0]
@@ -131,11 +129,11 @@ class GRAVEPlayer(Player):
             self.T.updateAMAF(t, played, res[0])
             return res
         else:
-            self.T.addAMAF(state)
+            self.T.addAMAF(problem, state)
             return self.forward_playoutAMAF(problem, state, played)
 
     def get_action(self, problem: GameProblem, state: State) -> Action:
-        self.T.addAMAF(state)
+        self.T.addAMAF(problem, state)
         root = self.T.look(state)
         for i in range(self.nb):
             s1 = state.copy()
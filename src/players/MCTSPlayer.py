@@ -6,28 +6,32 @@ import sys
 if __name__=="__main__":
     sys.path.append("src")
 
+from game_problem.BatchPlayouts import BatchPlayouts
 from game_problem.ChineseCheckers import ChineseCheckers
 
 from game_problem.GameProblem import GameProblem
 from game.Action import Action
 from game.State import State
+from game.Symmetry import canonical_key, canonical_order
 from players.Player import Player
 
 
 
 class TranspositionTable():
-    def __init__(self, MaxLegalMoves) -> None:
+    def __init__(self) -> None:
         self.T={}
-        self.MaxLegalMoves = MaxLegalMoves
 
     def add (self, state:State):
-        nplayouts = [0.0 for x in range (self.MaxLegalMoves)]
-        nwins = [0.0 for x in range (self.MaxLegalMoves)]
-        visited = [False for x in range(self.MaxLegalMoves)]
-        self.T[hash(state)] = [0, nplayouts, nwins, visited]
+        # Large enough for every position of the board (see Geometry.max_legal_moves)
+        size = state.board.geometry.max_legal_moves
+        nplayouts = [0.0 for x in range (size)]
+        nwins = [0.0 for x in range (size)]
+        visited = [False for x in range(size)]
+        # Symmetric positions share their entry - see canonical_order for the matching order of their moves
+        self.T[canonical_key(state)] = [0, nplayouts, nwins, visited]
 
     def look (self,state):
-        return self.T.get(hash(state), None)
+        return self.T.get(canonical_key(state), None)
 
 
 
@@ -36,31 +40,35 @@ class MCTSPlayer(Player):
     Random player (confused AI) - selects an action randomly from the list of valid actions
     """
 
-    def __init__(self, nb, player, MaxLegalMoves=60):
+    def __init__(self, nb, player, playouts_per_leaf=1):
         super().__init__()
         self._player_type = 'MCTS'
-        self.T = TranspositionTable(MaxLegalMoves)
+        self.T = TranspositionTable()
         self.nb = nb                    # number of playouts done before choosing a move
         self.player = player
+        # Playouts run together by BatchPlayouts when greater than 1 - faster than one by one from about 8 playouts
+        # (python src/game_problem/BatchPlayouts.py)
+        self.playouts_per_leaf = playouts_per_leaf
+        self.batch_playouts = None
 
     @staticmethod
     def playout(problem: GameProblem, state: State) -> int:
         new_state=state.copy()
         while not problem.terminal_test(new_state):
-            action = random.choice(list(problem.actions(new_state)))
-            new_state = problem.result(new_state, action)
+            action = random.choice(list(problem.actions(new_state, cached=False)))
+            problem.apply(new_state, action)
         return (problem.utility(new_state, state.player) + 1) / 2
     
     @staticmethod
     def forward_playout(problem: GameProblem, state: State) -> int:
         new_state=state.copy()
         while not problem.terminal_test(new_state):
-            moves = list(problem.forward_actions(new_state))
+            moves = list(problem.forward_actions(new_state, cached=False))
             
             if len(moves) == 0:
-                moves = list(problem.actions(new_state))
+                moves = list(problem.actions(new_state, cached=False))
             action = random.choice(moves)
-            new_state = problem.result(new_state, action)
+            problem.apply(new_state, action)
         return (problem.utility(new_state, state.player) + 1) / 2
     
     def search(self,  problem: GameProblem, state: State):
@@ -70,7 +78,7 @@ class MCTSPlayer(Player):
         if t != None:
             bestValue = 0
             best = 0
-            moves = list(problem.actions(state))
+            moves = canonical_order(state, problem.actions(state))
             for i in range (0, len (moves)):
                 val = 1000000.0
                 n = t[0]
@@ -91,11 +99,12 @@ class MCTSPlayer(Player):
             # print("#######################")
             # print(bestValue)
             # print(state.board)
-            state = problem.result(state, moves[best])
+            undo_token = problem.apply(state, moves[best])
             # print(state.board)
             # print(moves)
             t[3][best] = True                   # Useless to visit same node twice in a same descent
             res = self.search(problem, state)
+            problem.undo(state, undo_token)
             t[3][best] = False
             t [0] += 1
             t [1] [best] += 1
@@ -103,6 +112,10 @@ class MCTSPlayer(Player):
             return res
         else:
             self.T.add(state)
+            if self.playouts_per_leaf > 1:
+                if self.batch_playouts is None:
+                    self.batch_playouts = BatchPlayouts(problem)
+                return float(self.batch_playouts.playouts(state, self.playouts_per_leaf).mean())
             return MCTSPlayer.forward_playout(problem, state)
 
     def get_action(self, problem: GameProblem, state: State) -> Action:
@@ -110,7 +123,7 @@ class MCTSPlayer(Player):
             s1 = state.copy()
             res = self.search(problem, s1)
         t = self.T.look (state)
-        moves = list(problem.actions(state))
+        moves = canonical_order(state, problem.actions(state))
         best = moves [0]
         bestValue = t [1] [0]
         for i in range (1, len(moves)):
@@ -2,7 +2,8 @@ import multiprocessing as mp
 import sys
 import time
 from collections import deque
-from typing import Tuple, Optional
+from itertools import count
+from typing import Any, Dict, List, Tuple, Optional
 
 from game.Action import Action
 from game.State import State
@@ -13,6 +14,12 @@ from players.Player import Player
 sys.setrecursionlimit(2000)
 
 
+class SearchTimeout(Exception):
+    """
+    Raised inside the alpha-beta search once the time budget of the move is spent
+    """
+
+
 class MinimaxAIPlayer(Player):
     """
     A player that uses the Minimax algorithm with alpha-beta pruning to decide the next action
@@ -21,12 +28,21 @@ class MinimaxAIPlayer(Player):
             self,
             problem: GameProblem,
             max_player: int,
-            max_depth: int,
+            max_depth: Optional[int],
             heuristic: Heuristic,
             history_size: int = 10,
             verbose=False,
-            title: str = None
+            title: str = None,
+            time_limit: Optional[float] = None
     ):
+        """
+        :param max_depth: depth of the search - with a time limit, the maximal depth of the iterative deepening
+            (None for no maximal depth, which requires a time limit)
+        :param time_limit: optional time budget of a move in seconds - the search deepens one level at a time and
+            plays the best action of the deepest completed search
+        """
+        if max_depth is None and time_limit is None:
+            raise ValueError('A search with no maximal depth needs a time limit')
         # Sets up multiprocessing
         super().__init__()
         mp.freeze_support()
@@ -36,6 +52,16 @@ class MinimaxAIPlayer(Player):
         self.MAX_PLAYER = max_player
         self.heuristic = heuristic
         self.max_depth = max_depth
+        self.time_limit = time_limit
+
+        # Depth at which the current search is cut off, and deepest search completed for the last move
+        self.search_depth = max_depth
+        self.completed_depth = 0
+        # Iterative deepening only: time at which the search is aborted, best action of each searched state
+        # (keyed by its hash) tried first by the next iteration, flag telling if a search was cut off by the depth
+        self._deadline: Optional[float] = None
+        self._best_actions: Optional[Dict[int, Action]] = None
+        self._depth_cutoff = False
 
         # Counter for the evaluated states
         self.evaluated_states_count = 0
@@ -90,27 +116,80 @@ class MinimaxAIPlayer(Player):
         self._add_state_to_history(state)
         alpha = float('-inf')
         beta = float('inf')
-        best_val, best_action = self.max_value(state, 0, alpha, beta)
+        # The search works on a copy of the state, modified in place and restored by undo
+        evaluation = self.heuristic.evaluation(state, self.MAX_PLAYER)
+        if self.time_limit is not None:
+            best_action = self.iterative_deepening(state, evaluation)
+        else:
+            self.search_depth = self.max_depth
+            best_val, best_action = self.max_value(state.copy(), 0, alpha, beta, evaluation)
+            self.completed_depth = self.max_depth
         if self.verbose:
             print(list(self.prob.actions(state)))
         return best_action
 
-    def max_value(self, state: State, depth: int, alpha: float, beta: float) -> Tuple[float, Optional[Action]]:
+    def iterative_deepening(self, state: State, evaluation: Any) -> Action:
+        """
+        Searches at depth 1, 2, 3... until the time budget is spent - an unfinished search is discarded, the best
+        actions found by the previous searches are tried first, which makes the deeper searches prune more
+        :param state: current state of the game
+        :param evaluation: heuristic data of the state (see Heuristic.evaluation)
+        :return: best action of the deepest completed search
+        """
+        deadline = time.perf_counter() + self.time_limit
+        self._best_actions = {}
+        best_action = None
+        self.completed_depth = 0
+        try:
+            for depth in count(1) if self.max_depth is None else range(1, self.max_depth + 1):
+                self.search_depth = depth
+                # The first search always completes, so that there is an action to play
+                self._deadline = deadline if depth > 1 else None
+                self._depth_cutoff = False
+                _, action = self.max_value(state.copy(), 0, float('-inf'), float('inf'), evaluation)
+                best_action, self.completed_depth = action, depth
+                # A search that reached no depth cutoff explored the whole game tree - deeper ones would not change it
+                if not self._depth_cutoff or time.perf_counter() >= deadline:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self._deadline = None
+            self._best_actions = None
+        return best_action
+
+    def _order_actions(self, state: State, valid_actions: List[Action]):
+        """
+        Sorts the actions for the pruning - by step type, with the best action of the previous iterative deepening
+        search first
+        """
+        # Effectiveness of pruning - highly dependent of move ordering - we sort the actions by step type
+        # (ends=3, then jumps=2,then crawls=1) - allows to consider the jump ending before the jump backwards (reverse)
+        valid_actions.sort(key=lambda x: x.step_type, reverse=True)
+        if self._best_actions:
+            best_action = self._best_actions.get(hash(state))
+            if best_action is not None and best_action in valid_actions:
+                valid_actions.remove(best_action)
+                valid_actions.insert(0, best_action)
+
+    def max_value(self, state: State, depth: int, alpha: float, beta: float,
+                  evaluation: Any = None) -> Tuple[float, Optional[Action]]:
         """
         The max-value function of the alpha-beta search algorithm
         :param state: the current state of the game
         :param depth: value of the depth of recursion
         :param alpha: alpha value - the best value (min) that the MAX player can guarantee
         :param beta: beta value - the best value (max) that the MIN player can guarantee
+        :param evaluation: optional heuristic data of the state (see Heuristic.evaluation)
         :return: the evaluation and the best action
         """
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
         if self.cutoff_test(state, depth):
-            return self.eval_state(state, self.MAX_PLAYER), None
+            return self.eval_state(state, self.MAX_PLAYER, evaluation), None
 
         valid_actions = list(self.prob.actions(state))
-        # Effectiveness of pruning - highly dependent of move ordering - we sort the actions by step type
-        # (ends=3, then jumps=2,then crawls=1) - allows to consider the jump ending before the jump backwards (reverse)
-        valid_actions.sort(key=lambda x: x.step_type, reverse=True)
+        self._order_actions(state, valid_actions)
 
         max_eval = float('-inf')
         best_action = None
@@ -118,16 +197,20 @@ class MinimaxAIPlayer(Player):
 
         # For each action, calculate the evaluation and the best action
         for action in valid_actions:
-            # Get the child state as a result of the action applied
-            child = self.prob.result(state, action)
-            if self._state_is_in_history(child):
+            # Turn the state into the child state in place - reverted with undo once the child is searched
+            undo_token = self.prob.apply(state, action)
+            if self._state_is_in_history(state):
+                self.prob.undo(state, undo_token)
                 continue
+            # Heuristic data of the child, updated from the moved peg instead of being recomputed at the leaves
+            child_evaluation = None if evaluation is None else self.heuristic.update(evaluation, state, action)
             # If the game does not change turn after the action - still a MAX node
-            if self.prob.player(child) == self.MAX_PLAYER:
-                res, sub_action = self.max_value(child, depth + 1, alpha, beta)
+            if self.prob.player(state) == self.MAX_PLAYER:
+                res, sub_action = self.max_value(state, depth + 1, alpha, beta, child_evaluation)
             # If the game changes the turn after the action - becomes a MIN node
             else:
-                res, sub_action = self.min_value(child, depth + 1, alpha, beta)
+                res, sub_action = self.min_value(state, depth + 1, alpha, beta, child_evaluation)
+            self.prob.undo(state, undo_token)
             if depth == 0:
                 tuples.append((action, res, sub_action))
             # Update the best evaluation and the best action
@@ -139,58 +222,71 @@ class MinimaxAIPlayer(Player):
                 break
         if self.verbose and depth == 0:
             print(tuples)
+        if self._best_actions is not None and best_action is not None:
+            self._best_actions[hash(state)] = best_action
         return max_eval, best_action
 
-    def min_value(self, state: State, depth: int, alpha: float, beta: float) -> Tuple[float,Optional[Action]]:
+    def min_value(self, state: State, depth: int, alpha: float, beta: float,
+                  evaluation: Any = None) -> Tuple[float,Optional[Action]]:
         """
         The min-value function of the alpha-beta search algorithm
         :param state: the current state of the game
         :param depth: depth of recursion
         :param alpha: alpha value - the best value (min) that the MAX player can guarantee
         :param beta: beta value - the best value (max) that the MIN player can guarantee
+        :param evaluation: optional heuristic data of the state (see Heuristic.evaluation)
         :return:
         """
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
         if self.cutoff_test(state, depth):
-            return self.eval_state(state, self.MAX_PLAYER), None
+            return self.eval_state(state, self.MAX_PLAYER, evaluation), None
 
         min_eval = float('inf')
         best_action = None
 
         valid_actions = list(self.prob.actions(state))
-        # Effectiveness of pruning - highly dependent of move ordering - we sort the actions by step type
-        # (ends=3, then jumps=2,then crawls=1) - allows to consider the jump ending before the jump backwards (reverse)
-        valid_actions.sort(key=lambda x: x.step_type, reverse=True)
+        self._order_actions(state, valid_actions)
 
         # For each action, calculate the evaluation and the best action
         for action in valid_actions:
-            # Get the child state as a result of the action applied
-            child = self.prob.result(state, action)
-            if self._state_is_in_history(child):
+            # Turn the state into the child state in place - reverted with undo once the child is searched
+            undo_token = self.prob.apply(state, action)
+            if self._state_is_in_history(state):
+                self.prob.undo(state, undo_token)
                 continue
+            # Heuristic data of the child, updated from the moved peg instead of being recomputed at the leaves
+            child_evaluation = None if evaluation is None else self.heuristic.update(evaluation, state, action)
             # If the game does not change turn after the action - still a MIN node
-            if self.prob.player(child) == self.MAX_PLAYER:
-                res, sub_action = self.max_value(child, depth + 1, alpha, beta)
+            if self.prob.player(state) == self.MAX_PLAYER:
+                res, sub_action = self.max_value(state, depth + 1, alpha, beta, child_evaluation)
             # If the game changes the turn after the action - becomes a MAX node
             else:
-                res, sub_action = self.min_value(child, depth + 1, alpha, beta)
+                res, sub_action = self.min_value(state, depth + 1, alpha, beta, child_evaluation)
+            self.prob.undo(state, undo_token)
             if res < min_eval:
                 min_eval = res
                 best_action = action
                 beta = min(beta, res)
             if min_eval <= alpha:
                 break
+        if self._best_actions is not None and best_action is not None:
+            self._best_actions[hash(state)] = best_action
         return min_eval, best_action
 
-    def eval_state(self, state: State, player: int) -> float:
+    def eval_state(self, state: State, player: int, evaluation: Any = None) -> float:
         """
         Evaluates the state using the heuristic
         :param state: the state to be evaluated
         :param player: the player for which the state is evaluated
+        :param evaluation: optional heuristic data of the state for the player, kept up to date along the search
         :return: float value of the heuristic evaluation
         """
         self.evaluated_states_count += 1
         if self.prob.terminal_test(state):
             return self.prob.utility(state, player)
+        if evaluation is not None:
+            return self.heuristic.value(evaluation, state)
         return self.heuristic.eval(state, player)
 
     def cutoff_test(self, state: State, depth: int) -> bool:
@@ -200,7 +296,12 @@ class MinimaxAIPlayer(Player):
         :param depth: the depth of recursion of the node in the game tree
         :return: flag indicating if the search should be cutoff
         """
-        return self.prob.terminal_test(state) or depth == self.max_depth
+        if self.prob.terminal_test(state):
+            return True
+        if depth == self.search_depth:
+            self._depth_cutoff = True
+            return True
+        return False
 
     def _add_state_to_history(self, state: State):
         """
@@ -18,26 +18,25 @@ from players.Player import Player
 
 
 class TranspositionTable():
-    def __init__(self, MaxLegalMoves, BoardLength=7) -> None:
+    def __init__(self) -> None:
         self.T={}
-        self.MaxLegalMoves = MaxLegalMoves
-        self.BoardLength = BoardLength
-        self.CodeMaxLegalMoves = BoardLength**4 * 3
-
-    def add (self, state:State):
-        nplayouts = [0.0 for x in range (self.MaxLegalMoves)]
-        nwins = [0.0 for x in range (self.MaxLegalMoves)]
-        visited = [False for x in range(self.MaxLegalMoves)]
+
+    def add (self, problem: ChineseCheckers, state:State):
+        # Large enough for every position of the board (see ChineseCheckers.max_actions)
+        size = problem.max_actions(state.board.geometry)
+        nplayouts = [0.0 for x in range (size)]
+        nwins = [0.0 for x in range (size)]
+        visited = [False for x in range(size)]
         self.T[hash(state)] = [0, nplayouts, nwins, visited]
 
     def look (self,state):
         return self.T.get(hash(state), None)
 
-    def tocode(self, action):
-        return (action.step_type-1) + 3 * ((action.src[0]* self.BoardLength + action.src[1]) * self.BoardLength**2 + \
-                                           action.dest[0]* self.BoardLength + action.dest[1])
 
 class Policy():
+    """
+    Playout policy weights, keyed by dense move code (see ChineseCheckers.move_table)
+    """
     def __init__(self):
         self.p = {}
     
@@ -60,54 +59,57 @@ class PPAPlayer(Player):
     Random player (confused AI) - selects an action randomly from the list of valid actions
     """
 
-    def __init__(self, nb, player, MaxLegalMoves=60):
+    def __init__(self, nb, player):
         super().__init__()
         self._player_type = 'PPA'
-        self.T = TranspositionTable(MaxLegalMoves)
+        self.T = TranspositionTable()
         self.P = Policy()
         self.nb = nb                    # number of playouts done before choosing a move
         self.player = player
 
     def playout(self,problem: GameProblem, state: State) -> int:
         new_state=state.copy()
+        actions = problem.move_table(new_state.board.geometry)
         played = []
         while not problem.terminal_test(new_state):
-            moves = list(problem.forward_actions(new_state))
+            moves = list(problem.forward_actions(new_state, encoded=True, cached=False))
             if len(moves) == 0:
-                moves = list(problem.actions(new_state))
-                moves = [random.choice(moves)]              #chooses one move randomly or else wheight can lead to degenerated cases
+                moves = list(problem.actions(new_state, encoded=True, cached=False))
+                #chooses one move randomly or else wheight can lead to degenerated cases
+                moves = [random.choice(moves)]
             z=0
             for move in moves:
-                z += math.exp(self.P.get(self.T.tocode(move), 1/len(moves)))
+                z += math.exp(self.P.get(move, 1/len(moves)))
             stop = random.random() * z
             move = 0
             z=0
             while True:
-                z += math.exp(self.P.get(self.T.tocode(moves[move]), 1/len(moves)))
+                z += math.exp(self.P.get(moves[move], 1/len(moves)))
                 if z>= stop:
                     break
                 move += 1
             
-            new_state = problem.result(new_state, moves[move])
+            problem.apply(new_state, actions[moves[move]])
             played.append(moves[move])
         return (problem.utility(new_state, state.player) + 1) / 2, played
     
     def adapt(self, problem, winner, player, state, playout):
         polp = copy.deepcopy(self.P)
         new_state = state.copy()
+        actions = problem.move_table(new_state.board.geometry)
         alpha = 0.32
         for move in playout:
             if player == winner:
-                polp.put(self.T.tocode(move), alpha)
+                polp.put(move, alpha)
                 z=0
-                possible_moves = list(problem.actions(new_state))
+                possible_moves = list(problem.actions(new_state, encoded=True, cached=False))
 
                 for possible_move in possible_moves:
-                    z += math.exp(self.P.get(self.T.tocode(possible_move), 1/len(possible_moves)))
+                    z += math.exp(self.P.get(possible_move, 1/len(possible_moves)))
 
                 for possible_move in possible_moves:
-                    polp.put(self.T.tocode(possible_move), - alpha * math.exp(self.P.get(self.T.tocode(possible_move), 1/len(possible_moves)))/z)
-            new_state = problem.result(new_state, move)
+                    polp.put(possible_move, - alpha * math.exp(self.P.get(possible_move, 1/len(possible_moves)))/z)
+            problem.apply(new_state, actions[move])
             player = 3 - player
         self.P = polp
     
@@ -118,9 +120,9 @@ class PPAPlayer(Player):
         if t != None:
             bestValue = 0
             best = 0
-            moves = list(problem.forward_actions(state))
-            if len(moves) == 0:
-                moves = list(problem.actions(state))
+            # Forward moves, or every move when there is none - both read from one cached expansion
+            forward, moves = problem.forward_and_all_actions(state)
+            moves = forward or moves
             for i in range (0, len (moves)):
                 val = 1000000.0
                 n = t[0]
@@ -141,18 +143,19 @@ class PPAPlayer(Player):
             # print("#######################")
             # print(bestValue)
             # print(state.board)
-            state = problem.result(state, moves[best])
+            undo_token = problem.apply(state, moves[best])
             # print(state.board)
             # print(moves)
             t[3][best] = True                   # Useless to visit same node twice in a same descent
             res = self.search(problem, state)
+            problem.undo(state, undo_token)
             t[3][best] = False
             t [0] += 1
             t [1] [best] += 1
             t [2] [best] += res[0]
             return res
         else:
-            self.T.add(state)
+            self.T.add(problem, state)
             return self.playout(problem, state)
 
     def get_action(self, problem: GameProblem, state: State) -> Action:
@@ -162,9 +165,9 @@ class PPAPlayer(Player):
             if res[0] == 1:
                 self.adapt(problem,1, self.player, s1,res[1])
         t = self.T.look (state)
-        moves = list(problem.forward_actions(state))
-        if len(moves) == 0:
-            moves = list(problem.actions(state))
+        # Forward moves, or every move when there is none - both read from one cached expansion
+        forward, moves = problem.forward_and_all_actions(state)
+        moves = forward or moves
         best = moves [0]
         bestValue = t [1] [0]
         for i in range (1, len(moves)):
@@ -0,0 +1,35 @@
+import random
+from typing import List
+
+from game.State import State
+from game_problem.GameProblem import GameProblem
+
+
+def random_states(problem: GameProblem, seed: int, games: int = 1, steps: int = 60) -> List[State]:
+    """
+    States of random games - the initial state of each game and every state reached from it, until the game is over
+    or the number of steps is reached
+    :param problem: the game played
+    :param seed: seed of the random choice of the actions
+    :param games: number of games played
+    :param steps: maximal number of actions of a game
+    :return: list of states, in the order of the games
+    """
+    rng = random.Random(seed)
+    states = []
+    for _ in range(games):
+        state = problem.initial_state()
+        states.append(state)
+        for _ in range(steps):
+            if problem.terminal_test(state):
+                break
+            state = problem.result(state, rng.choice(list(problem.actions(state))))
+            states.append(state)
+    return states
+
+
+def random_state(problem: GameProblem, seed: int, steps: int = 30) -> State:
+    """
+    Last state of a random game (see random_states)
+    """
+    return random_states(problem, seed, steps=steps)[-1]
@@ -0,0 +1,20 @@
+import unittest
+
+from parameterized import parameterized
+
+from game_problem.ChineseCheckers import ChineseCheckers
+from tests.helpers import random_states
+
+
+class TestBatchActions(unittest.TestCase):
+    @parameterized.expand([(2,), (3,), (4,)])
+    def test_same_actions_as_actions_on_random_games(self, triangle_size: int):
+        sut = ChineseCheckers(triangle_size)
+        states = random_states(sut, triangle_size, games=5)
+
+        moves, offsets = sut.actions_batch(*sut.stack_states(states))
+
+        self.assertEqual(len(offsets), len(states) + 1)
+        for i, state in enumerate(states):
+            actions = sut.decode_actions(moves[offsets[i]:offsets[i + 1]], state.board.board_size)
+            self.assertEqual(actions, list(sut.actions(state)))
@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from game_problem.ChineseCheckers import ChineseCheckers
+from game_problem.Heuristic import AverageManhattanToCornerHeuristic, Heuristic, \
+    AverageEuclideanToCornerHeuristic, MaxManhattanToCornerHeuristic, SumOfPegsInCornerHeuristic, \
+    AverageEuclideanToEachCornerHeuristic, AverageManhattanToEachCornerHeuristic, WeightedHeuristic, \
+    EnsuredNormalizedHeuristic, AverageHexToCornerHeuristic, NoneHeuristic
+from tests.helpers import random_states
+
+HEURISTICS = [
+    NoneHeuristic(),
+    AverageManhattanToCornerHeuristic(),
+    AverageHexToCornerHeuristic(),
+    AverageManhattanToEachCornerHeuristic(),
+    AverageEuclideanToCornerHeuristic(),
+    AverageEuclideanToEachCornerHeuristic(),
+    MaxManhattanToCornerHeuristic(),
+    SumOfPegsInCornerHeuristic(),
+    WeightedHeuristic([(SumOfPegsInCornerHeuristic(), 0.2), (AverageManhattanToCornerHeuristic(), 0.8)]),
+    EnsuredNormalizedHeuristic(AverageEuclideanToCornerHeuristic()),
+]
+
+
+class TestBatchHeuristics(unittest.TestCase):
+    @parameterized.expand([(heuristic, layout) for heuristic in HEURISTICS for layout in ('diamond', 'star')])
+    def test_same_values_as_eval(self, heuristic: Heuristic, layout: str):
+        states = random_states(ChineseCheckers(3, layout=layout), 0, games=3, steps=200)
+        boards = np.stack([state.board.matrix for state in states])
+        geometry = states[0].board.geometry
+
+        for player in (1, 2):
+            values = heuristic.eval_batch(boards, player, geometry)
+            self.assertEqual(values.shape, (len(states),))
+            np.testing.assert_allclose(values, [heuristic.eval(state, player) for state in states], atol=1e-9)
+
+    def test_default_eval_batch_evaluates_each_board(self):
+        class PegRowHeuristic(Heuristic):
+            def eval(self, state, player):
+                return state.board.peg_cells(player)[0][0] / state.board.board_size
+
+        states = random_states(ChineseCheckers(3), 1)[:10]
+        boards = np.stack([state.board.matrix for state in states])
+
+        np.testing.assert_allclose(PegRowHeuristic().eval_batch(boards, 1),
+                                   [PegRowHeuristic().eval(state, 1) for state in states])
@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from game.Action import Action
+from game_problem.BatchPlayouts import BatchPlayouts, step_tables
+from game_problem.ChineseCheckers import ChineseCheckers
+from game_problem.MacroChineseCheckers import MacroChineseCheckers
+from tests.helpers import random_states
+
+
+class TestBatchPlayouts(unittest.TestCase):
+    @parameterized.expand([(True,), (False,)])
+    def test_playouts_end_with_win_or_loss(self, forward: bool):
+        problem = ChineseCheckers(triangle_size=2)
+        sut = BatchPlayouts(problem, forward=forward, seed=0)
+
+        outcomes = sut.playouts(problem.initial_state(), 50)
+
+        self.assertEqual(outcomes.shape, (50,))
+        self.assertTrue(np.isin(outcomes, (0, 1)).all())
+
+    def test_playout_from_terminal_state_is_its_utility(self):
+        problem = ChineseCheckers(triangle_size=2)
+        state = problem.initial_state()
+        state.board.matrix = np.array([
+            [0, 0, 0, 1, 1],
+            [0, 0, 0, 0, 1],
+            [2, 0, 0, 0, 0],
+            [2, 0, 0, 0, 0],
+            [2, 1, 0, 0, 0],
+        ])
+        state.player = 2
+        sut = BatchPlayouts(problem, seed=0)
+
+        self.assertEqual(list(sut.playouts(state, 3)), [0, 0, 0])
+
+    @parameterized.expand([('diamond',), ('star',)])
+    def test_step_weights_match_actions(self, layout: str):
+        problem = ChineseCheckers(triangle_size=3, layout=layout)
+        states = random_states(problem, 0, games=3)
+        tables = step_tables(3, layout)
+        board_size = states[0].board.board_size
+        boards, cells, players, peg_modes = BatchPlayouts.stack_playouts(states)
+
+        weights = BatchPlayouts.step_weights(boards, cells, players, peg_modes, tables)
+
+        for i, state in enumerate(states):
+            steps = {}
+            for peg, rank in zip(*np.nonzero(weights[i])):
+                src = cells[i, players[i], peg]
+                action = Action(divmod(int(src), board_size), divmod(int(tables.destinations[src, rank]), board_size),
+                                int(tables.step_types[rank]))
+                steps[action] = weights[i, peg, rank] == 2
+            self.assertEqual(set(steps), set(problem.actions(state)))
+            self.assertEqual({action for action, is_forward in steps.items() if is_forward},
+                             set(problem.forward_actions(state)))
+
+    def test_macro_moves_are_rejected(self):
+        with self.assertRaises(ValueError):
+            BatchPlayouts(MacroChineseCheckers(triangle_size=3))
+
+    def test_unfinished_playouts_are_draws(self):
+        problem = ChineseCheckers(triangle_size=3)
+        sut = BatchPlayouts(problem, max_steps=1, seed=0)
+
+        self.assertEqual(list(sut.playouts(problem.initial_state(), 4)), [0.5] * 4)
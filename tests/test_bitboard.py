@@ -0,0 +1,71 @@
+import random
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from game.Action import Action
+from game.BitBoard import BitBoard
+from game.Step import Step
+from game_problem.BitboardChineseCheckers import BitboardChineseCheckers
+from game_problem.ChineseCheckers import ChineseCheckers
+
+
+class TestBitboard(unittest.TestCase):
+    def test_matrix_view_of_initial_board(self):
+        sut = BitboardChineseCheckers(triangle_size=3)
+        reference = ChineseCheckers(triangle_size=3)
+
+        self.assertTrue(np.array_equal(sut.initial_state().board.matrix, reference.initial_state().board.matrix))
+
+    def test_actions_should_detect_jumps(self):
+        """
+           0  1  2  3  4
+        0  x  .  x  .  .
+        1  .  2  2  .  .
+        2  x  2  1  2  x
+        3  .  .  2  2  .
+        4  .  .  x  .  x
+        """
+        board = BitBoard(triangle_size=2, initialised=False)
+        board.place_pegs(1, [(2, 2)])
+        board.place_pegs(2, [(1, 1), (1, 2), (2, 1), (2, 3), (3, 2), (3, 3)])
+        sut = BitboardChineseCheckers(triangle_size=2)
+        state = sut.initial_state()
+        state.board = board
+
+        actions = list(sut.actions(state))
+
+        self.assertIn(Action((2, 2), (0, 0), Step.JUMP), actions)
+        self.assertIn(Action((2, 2), (4, 4), Step.JUMP), actions)
+        self.assertEqual(len(actions), 6)
+
+    def test_jump_tail_only_moves_the_jumping_peg(self):
+        sut = BitboardChineseCheckers(triangle_size=2)
+        state = sut.initial_state()
+
+        jumped = sut.result(state, Action((4, 0), (4, 2), Step.JUMP))
+
+        self.assertEqual(jumped.player, 1)
+        actions = list(sut.actions(jumped))
+        self.assertIn(Action((4, 2), (4, 2), Step.END), actions)
+        self.assertTrue(all(action.src == (4, 2) for action in actions))
+
+    @parameterized.expand([(2,), (3,), (4,)])
+    def test_same_actions_as_matrix_backend_on_random_games(self, triangle_size: int):
+        reference = ChineseCheckers(triangle_size)
+        sut = BitboardChineseCheckers(triangle_size)
+        rng = random.Random(triangle_size)
+        for _ in range(5):
+            reference_state, state = reference.initial_state(), sut.initial_state()
+            for _ in range(100):
+                self.assertEqual(reference.terminal_test(reference_state), sut.terminal_test(state))
+                if reference.terminal_test(reference_state):
+                    self.assertEqual(reference.utility(reference_state, 1), sut.utility(state, 1))
+                    break
+                actions = sorted(reference.actions(reference_state))
+                self.assertEqual(actions, sorted(sut.actions(state)))
+                self.assertEqual(sorted(reference.forward_actions(reference_state)),
+                                 sorted(sut.forward_actions(state)))
+                action = rng.choice(actions)
+                reference_state, state = reference.result(reference_state, action), sut.result(state, action)
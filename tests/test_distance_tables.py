@@ -0,0 +1,32 @@
+import unittest
+from collections import deque
+
+from parameterized import parameterized
+
+from game.Geometry import board_geometry
+
+
+class TestDistanceTables(unittest.TestCase):
+    @parameterized.expand([(2, 'diamond'), (3, 'diamond'), (2, 'star'), (3, 'star')])
+    def test_hex_distance_is_the_number_of_crawls(self, triangle_size: int, layout: str):
+        geometry = board_geometry(triangle_size, layout)
+        for src in geometry.cells:
+            crawls = {src: 0}
+            queue = deque([src])
+            while queue:
+                cell = queue.popleft()
+                for neighbour in geometry.neighbours[cell]:
+                    if neighbour not in crawls:
+                        crawls[neighbour] = crawls[cell] + 1
+                        queue.append(neighbour)
+            for cell in geometry.cells:
+                self.assertEqual(geometry.hex_distances[src][cell], crawls[cell])
+
+    def test_distances_between_two_cells(self):
+        geometry = board_geometry(3)
+
+        self.assertEqual(geometry.manhattan_distances[0, 6, 4, 1], 9)
+        self.assertAlmostEqual(geometry.euclidean_distances[0, 6, 4, 1], 41 ** 0.5)
+        self.assertEqual(geometry.hex_distances[0, 6, 4, 1], 9)
+        self.assertEqual(geometry.hex_distances[1, 1, 4, 3], 3)
+        self.assertEqual(geometry.hex_distances[4, 3, 1, 1], 3)
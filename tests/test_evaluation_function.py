@@ -3,13 +3,16 @@ import unittest
 import numpy as np
 from parameterized import parameterized
 
+from game.BitBoard import BitBoard
 from game.Board import Board
 from game.State import State
 from game_problem.ChineseCheckers import ChineseCheckers
 from game_problem.Heuristic import average_manhattan_to_corner, AverageManhattanToCornerHeuristic, Heuristic, \
     AverageEuclideanToCornerHeuristic, MaxManhattanToCornerHeuristic, NoneHeuristic, SumOfPegsInCornerHeuristic, \
-    AverageEuclideanToEachCornerHeuristic, AverageManhattanToEachCornerHeuristic
+    AverageEuclideanToEachCornerHeuristic, AverageManhattanToEachCornerHeuristic, AverageHexToCornerHeuristic, \
+    WeightedHeuristic
 from players.MinimaxAIPlayer import MinimaxAIPlayer
+from tests.helpers import random_states
 
 
 class TestEvaluationFunction(unittest.TestCase):
@@ -33,6 +36,7 @@ class TestEvaluationFunction(unittest.TestCase):
 
     @parameterized.expand([
         AverageManhattanToCornerHeuristic(),
+        AverageHexToCornerHeuristic(),
         AverageManhattanToEachCornerHeuristic(),
         AverageEuclideanToCornerHeuristic(),
         AverageEuclideanToEachCornerHeuristic(),
@@ -61,6 +65,7 @@ class TestEvaluationFunction(unittest.TestCase):
 
     @parameterized.expand([
         AverageManhattanToCornerHeuristic(),
+        AverageHexToCornerHeuristic(),
         AverageManhattanToEachCornerHeuristic(),
         AverageEuclideanToCornerHeuristic(),
         AverageEuclideanToEachCornerHeuristic(),
@@ -147,3 +152,22 @@ class TestEvaluationFunction(unittest.TestCase):
 
         self.assertEqual(2 / 3, result_player_1)
         self.assertEqual(3 / 3, result_player_2)
+
+    @parameterized.expand([('diamond', Board), ('star', Board), ('diamond', BitBoard)])
+    def test_weighted_heuristic_matches_its_components(self, layout: str, board_cls):
+        heuristics = [
+            (SumOfPegsInCornerHeuristic(), 0.125),
+            (AverageManhattanToCornerHeuristic(), 0.25),
+            (AverageHexToCornerHeuristic(), 0.125),
+            (AverageEuclideanToCornerHeuristic(), 0.25),
+            (MaxManhattanToCornerHeuristic(), 0.125),
+            (AverageEuclideanToEachCornerHeuristic(), 0.125),
+        ]
+        sut = WeightedHeuristic(heuristics)
+        for state in random_states(ChineseCheckers(3, layout=layout), 0, steps=100):
+            state = State(board_cls(3, matrix=state.board.matrix, layout=layout))
+            for player in (1, 2):
+                expected = 0
+                for heuristic, weight in heuristics:
+                    expected += round(heuristic.eval(state, player), 4) * weight
+                self.assertEqual(sut.eval(state, player), expected)
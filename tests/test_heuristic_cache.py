@@ -0,0 +1,53 @@
+import unittest
+
+from game_problem.ChineseCheckers import ChineseCheckers
+from game_problem.Heuristic import AverageManhattanToCornerHeuristic, CachedHeuristic, Heuristic
+
+
+class CountingHeuristic(Heuristic):
+    def __init__(self):
+        self.calls = 0
+
+    def eval(self, state, player):
+        self.calls += 1
+        return AverageManhattanToCornerHeuristic().eval(state, player)
+
+
+class TestHeuristicCache(unittest.TestCase):
+    def test_transposed_positions_are_evaluated_once(self):
+        problem = ChineseCheckers(3)
+        inner = CountingHeuristic()
+        sut = CachedHeuristic(inner)
+        state = problem.initial_state()
+        actions = list(problem.actions(state))
+        first = actions[0]
+        second = next(action for action in actions if {action.src, action.dest}.isdisjoint({first.src, first.dest}))
+        # Both orders of two moves of different pegs reach the same board
+        a = problem.result(problem.result(state, first), second)
+        b = problem.result(problem.result(state, second), first)
+
+        value = sut.eval(a, 1)
+
+        self.assertEqual(sut.eval(b, 1), value)
+        self.assertEqual(inner.eval(b, 1), value)
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual(sut.hit_rate, 0.5)
+
+    def test_players_are_cached_separately(self):
+        inner = CountingHeuristic()
+        sut = CachedHeuristic(inner)
+        state = ChineseCheckers(3).initial_state()
+
+        sut.eval(state, 1)
+        sut.eval(state, 2)
+
+        self.assertEqual(inner.calls, 2)
+
+    def test_cache_is_bounded(self):
+        problem = ChineseCheckers(3)
+        sut = CachedHeuristic(CountingHeuristic(), max_size=3)
+        state = problem.initial_state()
+        for action in list(problem.actions(state))[:10]:
+            sut.eval(problem.result(state, action), 1)
+
+        self.assertEqual(len(sut.cache), 3)
@@ -0,0 +1,54 @@
+import random
+import unittest
+
+from parameterized import parameterized
+
+from game_problem.BitboardChineseCheckers import BitboardChineseCheckers
+from game_problem.ChineseCheckers import ChineseCheckers
+from game_problem.Heuristic import AverageManhattanToCornerHeuristic, Heuristic, \
+    AverageEuclideanToCornerHeuristic, MaxManhattanToCornerHeuristic, SumOfPegsInCornerHeuristic, \
+    AverageEuclideanToEachCornerHeuristic, AverageManhattanToEachCornerHeuristic, WeightedHeuristic, \
+    EnsuredNormalizedHeuristic, AverageHexToCornerHeuristic
+from game_problem.MacroChineseCheckers import MacroChineseCheckers
+
+HEURISTICS = [
+    AverageManhattanToCornerHeuristic(),
+    AverageHexToCornerHeuristic(),
+    AverageManhattanToEachCornerHeuristic(),
+    AverageEuclideanToCornerHeuristic(),
+    AverageEuclideanToEachCornerHeuristic(),
+    MaxManhattanToCornerHeuristic(),
+    SumOfPegsInCornerHeuristic(),
+    WeightedHeuristic([(SumOfPegsInCornerHeuristic(), 0.2), (AverageManhattanToCornerHeuristic(), 0.8)]),
+    EnsuredNormalizedHeuristic(AverageEuclideanToCornerHeuristic()),
+]
+
+
+class TestIncrementalHeuristics(unittest.TestCase):
+    @parameterized.expand([(heuristic, problem) for heuristic in HEURISTICS
+                           for problem in (ChineseCheckers(3), BitboardChineseCheckers(3), MacroChineseCheckers(3))])
+    def test_updated_value_matches_eval(self, heuristic: Heuristic, problem: ChineseCheckers):
+        self.assertTrue(heuristic.incremental)
+        rng = random.Random(0)
+        for _ in range(3):
+            state = problem.initial_state()
+            evaluations = {player: heuristic.evaluation(state, player) for player in (1, 2)}
+            for _ in range(150):
+                if problem.terminal_test(state):
+                    break
+                action = rng.choice(list(problem.actions(state)))
+                problem.apply(state, action)
+                for player in (1, 2):
+                    evaluations[player] = heuristic.update(evaluations[player], state, action)
+                    self.assertAlmostEqual(heuristic.value(evaluations[player], state), heuristic.eval(state, player))
+
+    def test_weighted_heuristic_is_only_incremental_with_incremental_parts(self):
+        class FullHeuristic(Heuristic):
+            def eval(self, state, player):
+                return 0.5
+
+        heuristic = WeightedHeuristic([(FullHeuristic(), 0.5), (SumOfPegsInCornerHeuristic(), 0.5)])
+        state = ChineseCheckers(3).initial_state()
+
+        self.assertFalse(heuristic.incremental)
+        self.assertEqual(heuristic.value(heuristic.evaluation(state, 1), state), heuristic.eval(state, 1))
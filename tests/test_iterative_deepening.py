@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+from game_problem.ChineseCheckers import ChineseCheckers
+from game_problem.Heuristic import AverageManhattanToCornerHeuristic
+from players.MinimaxAIPlayer import MinimaxAIPlayer
+
+
+class FakeClock:
+    """
+    Replaces time.perf_counter - the time moves forward by a fixed tick on each read
+    """
+    def __init__(self, tick: float):
+        self.now = 0.0
+        self.tick = tick
+
+    def __call__(self) -> float:
+        self.now += self.tick
+        return self.now
+
+
+def patch_clock(clock: FakeClock):
+    return mock.patch('players.MinimaxAIPlayer.time', perf_counter=clock)
+
+
+class TestIterativeDeepening(unittest.TestCase):
+    def test_move_within_the_time_budget(self):
+        problem = ChineseCheckers(3)
+        state = problem.initial_state()
+        sut = MinimaxAIPlayer(problem, 1, None, AverageManhattanToCornerHeuristic(), time_limit=0.2)
+        clock = FakeClock(0.001)
+
+        with patch_clock(clock):
+            action = sut.get_action(problem, state)
+
+        # The search in progress is abandoned as soon as a node is reached after the deadline
+        self.assertLessEqual(clock.now, 0.2 + 5 * clock.tick)
+        self.assertGreaterEqual(sut.completed_depth, 2)
+        self.assertEqual(sut.search_depth, sut.completed_depth + 1)
+        # The action is the one of the deepest completed search
+        fixed_depth = MinimaxAIPlayer(problem, 1, sut.completed_depth, AverageManhattanToCornerHeuristic())
+        self.assertEqual(action, fixed_depth.get_action(problem, state))
+
+    def test_first_depth_is_always_searched(self):
+        problem = ChineseCheckers(3)
+        state = problem.initial_state()
+        sut = MinimaxAIPlayer(problem, 1, None, AverageManhattanToCornerHeuristic(), time_limit=0)
+        fixed_depth = MinimaxAIPlayer(problem, 1, 1, AverageManhattanToCornerHeuristic())
+
+        self.assertEqual(sut.get_action(problem, state), fixed_depth.get_action(problem, state))
+        self.assertEqual(sut.completed_depth, 1)
+
+    def test_stops_at_the_maximal_depth(self):
+        problem = ChineseCheckers(2)
+        state = problem.initial_state()
+        sut = MinimaxAIPlayer(problem, 1, 3, AverageManhattanToCornerHeuristic(), time_limit=1)
+
+        with patch_clock(FakeClock(0)):
+            action = sut.get_action(problem, state)
+
+        self.assertIn(action, list(problem.actions(state)))
+        self.assertEqual(sut.completed_depth, 3)
+
+    def test_unbounded_search_is_rejected(self):
+        problem = ChineseCheckers(2)
+
+        with self.assertRaises(ValueError):
+            MinimaxAIPlayer(problem, 1, None, AverageManhattanToCornerHeuristic())
@@ -0,0 +1,74 @@
+import random
+import unittest
+
+from parameterized import parameterized
+
+from game.Action import Action
+from game.Board import Board
+from game.Step import Step
+from game_problem.ChineseCheckers import ChineseCheckers
+from game_problem.MacroChineseCheckers import MacroChineseCheckers
+from players.GRAVEPlayer import GRAVEPlayer
+from players.PPAPlayer import PPAPlayer
+from tests.helpers import random_states
+
+
+class TestMacroMoves(unittest.TestCase):
+    def test_jump_chains_are_collapsed(self):
+        """
+           0  1  2  3  4  5  6
+        2  x  .  .  .  .  .  .
+        3  2  .  .  .  .  .  .
+        4  x  .  .  .  .  .  .
+        5  2  .  .  .  .  .  .
+        6  1  .  .  .  .  .  .
+        """
+        board = Board(triangle_size=3, initialised=False)
+        board.place_pegs(1, [(6, 0)])
+        board.place_pegs(2, [(5, 0), (3, 0)])
+        sut = MacroChineseCheckers(triangle_size=3)
+        state = sut.initial_state()
+        state.board = board
+
+        actions = list(sut.actions(state))
+
+        self.assertIn(Action((6, 0), (4, 0), Step.JUMP), actions)
+        self.assertIn(Action((6, 0), (2, 0), Step.JUMP), actions)
+        self.assertIn(Action((6, 0), (6, 1), Step.CRAWL), actions)
+        self.assertEqual(len(actions), 3)
+        self.assertEqual(sut.result(state, Action((6, 0), (2, 0), Step.JUMP)).player, 2)
+
+    def test_destinations_are_distinct(self):
+        sut = MacroChineseCheckers(triangle_size=3)
+        for state in random_states(sut, 0, steps=40):
+            actions = list(sut.actions(state))
+            self.assertEqual(len(actions), len({(action.src, action.dest) for action in actions}))
+            self.assertTrue(all(action.src != action.dest for action in actions))
+
+    def test_turns_expand_into_legal_steps(self):
+        sut = MacroChineseCheckers(triangle_size=3)
+        step_problem = ChineseCheckers(triangle_size=3)
+        rng = random.Random(1)
+        state = sut.initial_state()
+        for _ in range(40):
+            if sut.terminal_test(state):
+                break
+            action = rng.choice(list(sut.actions(state)))
+            step_state = state
+            for step in sut.steps(state, action):
+                self.assertIn(step, list(step_problem.actions(step_state)))
+                step_state = step_problem.result(step_state, step)
+            state = sut.result(state, action)
+            self.assertEqual(step_state.board.hash_key(), state.board.hash_key())
+            self.assertEqual(step_state.player, state.player)
+
+    @parameterized.expand([(GRAVEPlayer,), (PPAPlayer,)])
+    def test_playout_players_play_turns(self, player_cls):
+        random.seed(0)
+        sut = MacroChineseCheckers(triangle_size=2)
+        players = {1: player_cls(10, 1), 2: player_cls(10, 2)}
+        state = sut.initial_state()
+        for _ in range(6):
+            action = players[state.player].get_action(sut, state)
+            self.assertIn(action, list(sut.actions(state)))
+            state = sut.result(state, action)
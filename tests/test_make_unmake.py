@@ -0,0 +1,48 @@
+import random
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from game_problem.BitboardChineseCheckers import BitboardChineseCheckers
+from game_problem.ChineseCheckers import ChineseCheckers
+
+
+class TestMakeUnmake(unittest.TestCase):
+    @parameterized.expand([(ChineseCheckers(3),), (BitboardChineseCheckers(3),)])
+    def test_apply_matches_result(self, sut):
+        rng = random.Random(1)
+        state = sut.initial_state()
+        working = state.copy()
+        for _ in range(60):
+            action = rng.choice(list(sut.actions(state)))
+            state = sut.result(state, action)
+            sut.apply(working, action)
+            self.assertEqual(state, working)
+            self.assertEqual(state.key, working.key)
+
+    @parameterized.expand([(ChineseCheckers(3),), (BitboardChineseCheckers(3),)])
+    def test_undo_restores_the_state(self, sut):
+        rng = random.Random(2)
+        initial = sut.initial_state()
+        working = initial.copy()
+        history = []
+        for _ in range(60):
+            history.append((working.copy(), sut.apply(working, rng.choice(list(sut.actions(working))))))
+
+        for previous, undo_token in reversed(history):
+            sut.undo(working, undo_token)
+            self.assertEqual(previous, working)
+        self.assertEqual(initial, working)
+
+    @parameterized.expand([(ChineseCheckers(4),), (BitboardChineseCheckers(4),)])
+    def test_peg_index_follows_the_moves(self, sut):
+        rng = random.Random(3)
+        state = sut.initial_state()
+        for _ in range(80):
+            undo_token = sut.apply(state, rng.choice(list(sut.actions(state))))
+            for player in (1, 2):
+                expected = [tuple(cell) for cell in np.argwhere(state.board.matrix == player)]
+                self.assertEqual(expected, state.board.peg_cells(player))
+        sut.undo(state, undo_token)
+        self.assertEqual(len(state.board.peg_cells(1)), 10)
@@ -0,0 +1,57 @@
+import unittest
+
+from game.Action import Action
+from game.Step import Step
+from game_problem.ChineseCheckers import ChineseCheckers
+from game_problem.LRUCache import LRUCache
+
+
+class TestMoveCache(unittest.TestCase):
+    def test_repeated_expansion_hits_the_cache(self):
+        sut = ChineseCheckers(triangle_size=3)
+        state = sut.initial_state()
+
+        first = list(sut.actions(state))
+        second = list(sut.actions(state))
+
+        self.assertEqual(first, second)
+        self.assertEqual((sut.move_cache.hits, sut.move_cache.misses), (1, 1))
+
+    def test_moved_state_misses_the_cache(self):
+        sut = ChineseCheckers(triangle_size=3)
+        state = sut.initial_state()
+        list(sut.actions(state))
+
+        sut.apply(state, Action((5, 0), (4, 0), Step.CRAWL))
+        actions = list(sut.actions(state))
+
+        self.assertEqual(actions, list(ChineseCheckers(3, move_cache_size=0).actions(state)))
+        self.assertEqual(sut.move_cache.misses, 2)
+
+    def test_forward_and_all_actions_are_cached_separately(self):
+        sut = ChineseCheckers(triangle_size=3)
+        state = sut.initial_state()
+
+        self.assertEqual(list(sut.forward_actions(state)), list(sut.forward_actions(state, cached=False)))
+        self.assertEqual(list(sut.actions(state)), list(sut.actions(state, cached=False)))
+        self.assertEqual(len(sut.move_cache), 2)
+
+    def test_uncached_expansion_leaves_the_cache_untouched(self):
+        sut = ChineseCheckers(triangle_size=3)
+
+        list(sut.actions(sut.initial_state(), cached=False))
+
+        self.assertEqual((len(sut.move_cache), sut.move_cache.hits, sut.move_cache.misses), (0, 0, 0))
+
+    def test_lru_cache_evicts_least_recently_used_entry(self):
+        sut = LRUCache(2)
+        sut.put('a', 1)
+        sut.put('b', 2)
+        sut.get('a')
+
+        sut.put('c', 3)
+
+        self.assertIn('a', sut)
+        self.assertNotIn('b', sut)
+        self.assertEqual(len(sut), 2)
+        self.assertEqual(sut.hit_rate, 1)
@@ -0,0 +1,38 @@
+import unittest
+
+from parameterized import parameterized
+
+from game.Action import Action
+from game.Geometry import board_geometry
+from game.Step import Step
+from game_problem.BitboardChineseCheckers import BitboardChineseCheckers
+from game_problem.ChineseCheckers import ChineseCheckers
+from game_problem.MacroChineseCheckers import MacroChineseCheckers
+from tests.helpers import random_states
+
+
+class TestMoveCodes(unittest.TestCase):
+    def test_codes_cover_every_step_once(self):
+        geometry = board_geometry(2)
+
+        crawls = sum(len(neighbours) for neighbours in geometry.neighbours.values())
+        jumps = sum(len(jumps) for jumps in geometry.jumps.values())
+        self.assertEqual(len(geometry.moves), crawls + jumps + len(geometry.cells))
+        self.assertEqual(geometry.moves, sorted(geometry.moves))
+
+    def test_encode_decode_round_trip(self):
+        sut = ChineseCheckers(triangle_size=3)
+        action = Action((6, 0), (4, 0), Step.JUMP)
+
+        self.assertEqual(sut.decode(sut.encode(action)), action)
+
+    @parameterized.expand([(ChineseCheckers,), (BitboardChineseCheckers,), (MacroChineseCheckers,)])
+    def test_encoded_actions_match_actions_on_random_games(self, problem_cls):
+        sut = problem_cls(triangle_size=3)
+        for state in random_states(sut, 0, steps=80):
+            actions = list(sut.actions(state))
+            self.assertEqual(list(sut.actions(state, encoded=True)), [sut.encode(action) for action in actions])
+            self.assertEqual([sut.decode(code) for code in sut.actions(state, encoded=True)], actions)
+            self.assertLessEqual(len(actions), sut.max_actions(state.board.geometry))
+            self.assertEqual(list(sut.forward_actions(state, encoded=True)),
+                             [sut.encode(action) for action in sut.forward_actions(state)])
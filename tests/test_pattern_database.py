@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from game.Board import Board
+from game.State import State
+from game_problem.ChineseCheckers import ChineseCheckers
+from game_problem.Heuristic import PatternDatabaseHeuristic
+from game_problem.PatternDatabase import PatternDatabase
+
+
+class TestPatternDatabase(unittest.TestCase):
+    @parameterized.expand([('diamond',), ('star',)])
+    def test_single_peg_crawls_to_the_nearest_goal_cell(self, layout: str):
+        # Alone on the board a peg cannot jump
+        sut = PatternDatabase.build(2, 1, layout)
+        geometry = sut.geometry
+        for cell in geometry.cells:
+            nearest = min(geometry.hex_distances[goal][cell] for goal in geometry.goal_cells[1])
+            self.assertEqual(sut.turns([cell], 1), nearest)
+
+    def test_jumps_are_counted_as_one_turn(self):
+        sut = PatternDatabase.build(2, 2)
+        # Alone, (3, 4) crawls twice and (2, 4) once - together (3, 4) jumps over (2, 4) into the goal cell (1, 4),
+        # then (2, 4) jumps over it into (0, 4)
+        self.assertEqual(sut.turns([(3, 4)], 1), 2)
+        self.assertEqual(sut.turns([(2, 4)], 1), 1)
+        self.assertEqual(sut.turns([(3, 4), (2, 4)], 1), 2)
+        self.assertEqual(sut.turns([(0, 4), (0, 3)], 1), 0)
+
+    def test_players_are_symmetric(self):
+        sut = PatternDatabase.build(3, 3)
+        state = ChineseCheckers(3).initial_state()
+
+        self.assertEqual(sut.turns(state.board.peg_cells(1), 1), sut.initial_turns)
+        self.assertEqual(sut.turns(state.board.peg_cells(2), 2), sut.initial_turns)
+
+    def test_saved_tables_are_memory_mapped(self):
+        sut = PatternDatabase.build(2, 2)
+        with tempfile.TemporaryDirectory() as directory:
+            sut.save(directory)
+            loaded = PatternDatabase.load(directory, 2, 2)
+
+            for size, table in sut.tables.items():
+                self.assertIsInstance(loaded.tables[size], np.memmap)
+                np.testing.assert_array_equal(loaded.tables[size], table)
+            del loaded
+
+    def test_heuristic(self):
+        sut = PatternDatabaseHeuristic(PatternDatabase.build(2, 2))
+        initial = ChineseCheckers(2).initial_state()
+        finished = State(Board(2, matrix=np.array([
+            [0, 0, 0, 1, 1],
+            [0, 0, 0, 0, 1],
+            [0, 0, 0, 0, 0],
+            [2, 0, 0, 0, 0],
+            [2, 2, 0, 0, 0],
+        ])))
+
+        self.assertEqual(sut.eval(initial, 1), 0)
+        self.assertEqual(sut.eval(initial, 2), 0)
+        self.assertEqual(sut.eval(finished, 1), 1)
+        self.assertEqual(sut.eval(finished, 2), 1)
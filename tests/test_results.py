@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from game.Action import Action
+from game.Step import Step
+from game_problem.ChineseCheckers import ChineseCheckers
+from game_problem.MacroChineseCheckers import MacroChineseCheckers
+from tests.helpers import random_states
+
+
+class TestResults(unittest.TestCase):
+    @parameterized.expand([(2,), (3,)])
+    def test_children_match_result_on_random_games(self, triangle_size: int):
+        sut = ChineseCheckers(triangle_size)
+        for state in random_states(sut, triangle_size, steps=80):
+            actions = list(sut.actions(state))
+
+            children = sut.results(state, actions)
+
+            self.assertEqual(len(children), len(actions))
+            for i, action in enumerate(actions):
+                child = sut.result(state, action)
+                self.assertTrue(np.array_equal(children.boards[i], child.board.matrix))
+                self.assertEqual(int(children.keys[i]), child.key)
+                self.assertEqual(children.state(i), child)
+                self.assertEqual(children.terminal[i], sut.terminal_test(child))
+
+    def test_macro_children_match_result(self):
+        sut = MacroChineseCheckers(3)
+        for state in random_states(sut, 0, steps=30):
+            actions = list(sut.actions(state))
+
+            children = sut.results(state, actions)
+
+            for i, action in enumerate(actions):
+                child = sut.result(state, action)
+                self.assertEqual(children.state(i), child)
+                self.assertEqual(int(children.keys[i]), child.key)
+                self.assertEqual(children.terminal[i], sut.terminal_test(child))
+
+    def test_terminal_children_have_a_winner(self):
+        sut = ChineseCheckers(triangle_size=2)
+        state = sut.initial_state()
+        state.board.matrix = np.array([
+            [0, 0, 1, 0, 1],
+            [0, 0, 0, 0, 1],
+            [2, 0, 0, 0, 0],
+            [2, 0, 0, 0, 0],
+            [2, 0, 0, 0, 0],
+        ])
+
+        children = sut.results(state, sut.actions(state))
+
+        winning = [action for action, winner in zip(children.actions, children.winners) if winner == 1]
+        self.assertEqual(winning, [Action((0, 2), (0, 3), Step.CRAWL)])
+        self.assertFalse(children.terminal[children.actions.index(Action((1, 4), (0, 3), Step.CRAWL))])
+
+    def test_no_actions_give_no_children(self):
+        sut = ChineseCheckers(3)
+
+        children = sut.results(sut.initial_state(), [])
+
+        self.assertEqual(len(children), 0)
+        self.assertEqual(children.boards.shape, (0, 7, 7))
+        self.assertEqual(children.terminal.shape, (0,))
@@ -0,0 +1,63 @@
+import unittest
+
+from parameterized import parameterized
+
+from game.BitBoard import BitBoard
+from game.Geometry import board_geometry
+from game.State import State
+from game.Symmetry import board_symmetries
+from game_problem.BitboardChineseCheckers import BitboardChineseCheckers
+from game_problem.ChineseCheckers import ChineseCheckers
+from tests.helpers import random_state, random_states
+
+
+class TestStarBoard(unittest.TestCase):
+    @parameterized.expand([(2, 37, 3), (3, 73, 6), (4, 121, 10)])
+    def test_geometry(self, triangle_size: int, cells: int, corner_size: int):
+        geometry = board_geometry(triangle_size, 'star')
+
+        self.assertEqual(geometry.board_size, 4 * triangle_size + 1)
+        self.assertEqual(len(geometry.cells), cells)
+        self.assertEqual(int(geometry.valid_mask.sum()), cells)
+        self.assertEqual(geometry.corner_size, corner_size)
+        for player in (1, 2):
+            self.assertTrue(all(geometry.valid_mask[tuple(cell)] for cell in geometry.goal_corners[player]))
+
+    def test_initial_state(self):
+        state = ChineseCheckers(4, layout='star').initial_state()
+
+        self.assertEqual(len(state.board.peg_cells(1)), 10)
+        self.assertEqual(len(state.board.peg_cells(2)), 10)
+        self.assertFalse(state.board.matrix[~state.board.geometry.valid_mask].any())
+
+    def test_moves_stay_on_the_board(self):
+        sut = ChineseCheckers(4, layout='star')
+        for state in random_states(sut, 0, games=3):
+            valid = state.board.geometry.valid_mask
+            for action in sut.actions(state):
+                self.assertTrue(valid[action.dest])
+
+    def test_same_actions_as_actions_batch(self):
+        sut = ChineseCheckers(3, layout='star')
+        states = random_states(sut, 1, games=3)
+
+        moves, offsets = sut.actions_batch(*sut.stack_states(states), valid=states[0].board.geometry.valid_mask)
+
+        for i, state in enumerate(states):
+            actions = sut.decode_actions(moves[offsets[i]:offsets[i + 1]], state.board.board_size)
+            self.assertEqual(actions, list(sut.actions(state)))
+
+    def test_same_actions_as_bitboard(self):
+        sut = ChineseCheckers(3, layout='star')
+        bitboard = BitboardChineseCheckers(3, layout='star')
+        for state in random_states(sut, 2, games=3):
+            bitboard_state = State.from_bytes(3, state.to_bytes(), BitBoard, 'star')
+            self.assertEqual(sorted(sut.actions(state)), sorted(bitboard.actions(bitboard_state)))
+
+    def test_symmetries_preserve_the_board(self):
+        sut = ChineseCheckers(3, layout='star')
+        state = random_state(sut, 3, steps=60)
+        for symmetry in board_symmetries(state.board.geometry):
+            image = symmetry.state(state)
+            self.assertEqual(image.key, symmetry.key(state))
+            self.assertEqual(sorted(map(symmetry.action, sut.actions(state))), sorted(sut.actions(image)))
@@ -1,4 +1,9 @@
+from game.BitBoard import BitBoard
+from game.Board import Board
+from game.State import State
+from game.Step import Step
 from game_problem.ChineseCheckers import ChineseCheckers
+from tests.helpers import random_states
 import unittest
 
 
@@ -24,4 +29,39 @@ class TestStateHashing(unittest.TestCase):
         state2 = sut.initial_state()
         state2.board.move((3, 0), (2, 0))
 
-        self.assertNotEqual(hash(state1), hash(state2))
\ No newline at end of file
+        self.assertNotEqual(hash(state1), hash(state2))
+
+    def test_hashing_depends_on_player_mode_and_peg(self):
+        sut = ChineseCheckers(triangle_size=2)
+        state1 = sut.initial_state()
+        state2 = State(state1.board, 2, state1.mode, state1.peg)
+        state3 = State(state1.board, state1.player, Step.JUMP, (4, 2))
+
+        self.assertNotEqual(hash(state1), hash(state2))
+        self.assertNotEqual(hash(state1), hash(state3))
+
+    def test_incremental_key_matches_recomputed_key(self):
+        sut = ChineseCheckers(triangle_size=3)
+        for state in random_states(sut, 0, steps=100):
+            rebuilt = State(Board(3, matrix=state.board.matrix.copy()), state.player, state.mode, state.peg,
+                            state.visited)
+            self.assertEqual(state.key, rebuilt.key)
+            self.assertEqual(state, rebuilt)
+
+    def test_colliding_keys_are_told_apart_by_the_pegs(self):
+        sut = ChineseCheckers(triangle_size=2)
+        state1 = sut.initial_state()
+        state2 = sut.initial_state()
+        state2.board.move((3, 0), (2, 0))
+        # Forge a collision of the Zobrist keys of the boards
+        state2.board.zobrist = state1.board.zobrist
+
+        self.assertEqual(hash(state1), hash(state2))
+        self.assertNotEqual(state1, state2)
+
+    def test_equality_across_board_backends(self):
+        sut = ChineseCheckers(triangle_size=3)
+        for state in random_states(sut, 1, steps=40):
+            bitboard = State(BitBoard(3, matrix=state.board.matrix), state.player, state.mode, state.peg,
+                             state.visited)
+            self.assertEqual(state, bitboard)
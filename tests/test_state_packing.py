@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from game.BitBoard import BitBoard
+from game.Board import Board
+from game.State import State
+from game_problem.BitboardChineseCheckers import BitboardChineseCheckers
+from game_problem.ChineseCheckers import ChineseCheckers
+from tests.helpers import random_states
+
+
+class TestStatePacking(unittest.TestCase):
+    def test_board_matrix_is_int8(self):
+        board = Board(3, matrix=np.zeros((7, 7), dtype=int))
+
+        self.assertEqual(board.matrix.dtype, np.int8)
+        self.assertEqual(Board(3).matrix.dtype, np.int8)
+
+    def test_board_matrix_is_copied(self):
+        matrix = Board(3).matrix.copy()
+        board = Board(3, matrix=matrix)
+        matrix[matrix != 0] = 0
+
+        self.assertEqual(len(board.peg_cells(1)), 6)
+        self.assertEqual(np.count_nonzero(board.matrix), 12)
+
+    @parameterized.expand([(ChineseCheckers(3), Board), (BitboardChineseCheckers(3), BitBoard)])
+    def test_packed_state_round_trip(self, sut, board_cls):
+        for state in random_states(sut, 0, steps=40):
+            packed = state.to_bytes()
+            unpacked = State.from_bytes(3, packed, board_cls)
+            self.assertEqual(state, unpacked)
+            self.assertEqual(state.key, unpacked.key)
+            self.assertEqual(len(packed), 5 + 2 * len(state.visited) + 13)
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from game.Geometry import board_geometry
+from game.Symmetry import board_symmetries, canonical_key, canonical_order
+from game_problem.ChineseCheckers import ChineseCheckers
+from tests.helpers import random_state
+
+
+class TestSymmetry(unittest.TestCase):
+    @parameterized.expand([(seed,) for seed in range(5)])
+    def test_symmetries_map_keys_and_actions(self, seed: int):
+        problem = ChineseCheckers(triangle_size=3)
+        state = random_state(problem, seed)
+
+        for symmetry in board_symmetries(state.board.geometry):
+            image = symmetry.state(state)
+            self.assertEqual(symmetry.key(state), image.key, symmetry.name)
+            self.assertEqual(sorted(map(symmetry.action, problem.actions(state))), sorted(problem.actions(image)))
+            self.assertEqual(symmetry.state(image), state)
+
+    def test_anti_diagonal_keeps_the_goal_corners(self):
+        geometry = board_geometry(3)
+        symmetry = board_symmetries(geometry)[1]
+
+        for player in (1, 2):
+            corner = {tuple(cell) for cell in geometry.goal_corners[player]}
+            self.assertEqual({symmetry.cells[cell] for cell in corner}, corner)
+
+    def test_colour_swaps_exchange_the_goal_corners(self):
+        geometry = board_geometry(3)
+        top = {tuple(cell) for cell in geometry.goal_corners[1]}
+        bot = {tuple(cell) for cell in geometry.goal_corners[2]}
+
+        for symmetry in board_symmetries(geometry)[2:]:
+            self.assertEqual({symmetry.cells[cell] for cell in top}, bot)
+
+    @parameterized.expand([(seed,) for seed in range(5)])
+    def test_symmetric_states_share_key_and_action_order(self, seed: int):
+        problem = ChineseCheckers(triangle_size=3)
+        state = random_state(problem, seed)
+        symmetry = board_symmetries(state.board.geometry)[1]
+        image = symmetry.state(state)
+
+        self.assertEqual(canonical_key(state), canonical_key(image))
+        self.assertEqual([symmetry.action(action) for action in canonical_order(state, problem.actions(state))],
+                         canonical_order(image, problem.actions(image)))
+
+    def test_initial_state_is_its_own_anti_diagonal_image(self):
+        state = ChineseCheckers(triangle_size=3).initial_state()
+        image = board_symmetries(state.board.geometry)[1].state(state)
+
+        self.assertTrue(np.array_equal(image.board.matrix, state.board.matrix))
@@ -64,3 +64,23 @@ class TestTerminalState(unittest.TestCase):
         ])
         self.assertTrue(sut.terminal_test(state))
         self.assertEqual(sut.utility(state, player=1), -1)
+
+    def test_terminal_test_follows_moves_into_the_corner(self):
+        sut = ChineseCheckers(triangle_size=2)
+        state = sut.initial_state()
+        state.board.matrix = np.array([
+            [0, 0, 0, 0, 1],
+            [0, 0, 0, 1, 1],
+            [2, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0],
+            [2, 2, 0, 0, 0],
+        ])
+        self.assertFalse(sut.terminal_test(state))
+
+        state.board.move((1, 3), (0, 3))
+        self.assertTrue(sut.terminal_test(state))
+        self.assertEqual(sut.utility(state, player=1), 1)
+
+        state.board.move((0, 3), (1, 3))
+        self.assertFalse(sut.terminal_test(state))
+        self.assertEqual(sut.utility(state, player=1), 0)
@@ -98,3 +98,35 @@ class TestValidActions(unittest.TestCase):
         actions = list(sut.actions(state))
 
         self.assertEqual(len(actions), 0)
+
+    def test_jump_chain_should_not_land_on_visited_cells(self):
+        """
+           0  1  2  3  4
+        3  1  .  .  .  .
+        4  1  1  x  .  .
+        """
+        sut = ChineseCheckers(triangle_size=2)
+        state = sut.initial_state()
+
+        state = sut.result(state, Action((4, 0), (4, 2), Step.JUMP))
+        actions = list(sut.actions(state))
+
+        self.assertEqual(state.visited, ((4, 0),))
+        self.assertNotIn(Action((4, 2), (4, 0), Step.JUMP), actions)
+        self.assertEqual(actions, [Action((4, 2), (4, 2), Step.END)])
+
+    def test_forward_actions_only_move_towards_the_goal_corner(self):
+        sut = ChineseCheckers(triangle_size=3)
+        state = sut.initial_state()
+
+        for player in (1, 2):
+            state.player = player
+            forward, actions = sut.forward_and_all_actions(state)
+            sign = 1 if player == 1 else -1
+            expected = [action for action in actions
+                        if (sign * (action.dest[0] - action.src[0]) < 0 <= sign * (action.dest[1] - action.src[1]))
+                        or (sign * (action.dest[0] - action.src[0]) <= 0 < sign * (action.dest[1] - action.src[1]))]
+
+            self.assertEqual(list(sut.forward_actions(state)), expected)
+            self.assertEqual(forward, expected)
+            self.assertEqual(actions, list(sut.actions(state)))